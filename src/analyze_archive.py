@@ -0,0 +1,25 @@
+import argparse
+import json
+from src.services.archive_analysis import analyze_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate every position of a game record archive with the "
+                                                 "engine's scores and best move, and flag blunders.")
+    parser.add_argument('archive', help="game record file, e.g. written by run_benchmark --record")
+    parser.add_argument('--output', help="JSON lines file, one line per game (default: ARCHIVE.analysis.jsonl)")
+    parser.add_argument('--depth', type=int, default=4, help="search depth, 4 is the Godlike level")
+    parser.add_argument('--blunder-threshold', type=float, default=100,
+                        help="score drop from the best move that counts as a blunder")
+    parser.add_argument('--workers', type=int, default=None, help="analysing processes (all CPUs by default)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="games sent to a worker at once")
+    parser.add_argument('--checkpoint', help="progress file used to resume (default: OUTPUT.checkpoint)")
+    arguments = parser.parse_args()
+    output = arguments.output or arguments.archive + '.analysis.jsonl'
+    summary = analyze_archive(arguments.archive, output, arguments.depth, arguments.blunder_threshold,
+                              arguments.workers, arguments.chunk_size, arguments.checkpoint)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+import time
+from src.repository.evaluation_cache import EvaluationCache, fill_evaluation_cache, DEFAULT_CACHE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Work out the Medium and Hard moves of every position up to a "
+                                                 "number of plies and save them as the warm-start file of the "
+                                                 "evaluation cache.")
+    parser.add_argument('--plies', type=int, default=6, help="deepest position stored in the file")
+    parser.add_argument('--output', default=DEFAULT_CACHE_PATH, help="path of the generated file")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    # room for every position, whatever the capacity processes loading the file use
+    cache = EvaluationCache(capacity=2 ** 31)
+    positions = fill_evaluation_cache(cache, arguments.plies)
+    cache.save(arguments.output)
+    print(f"Saved {cache.get_statistics()['used']} moves of {positions} positions to {arguments.output} "
+          f"in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
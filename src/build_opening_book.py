@@ -0,0 +1,28 @@
+import argparse
+import sys
+import time
+from src.repository.opening_book import build_opening_book, write_opening_book, DEFAULT_BOOK_PATH
+from src.repository.solver import Solver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every position up to a number of plies and save them "
+                                                 "as the opening book of the Perfect difficulty level.")
+    parser.add_argument('--plies', type=int, default=12, help="deepest position stored in the book")
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help="path of the generated book file")
+    parser.add_argument('--table-size', type=int, default=2 ** 22, help="transposition table slots of the solver")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(positions):
+        if positions % 100 == 0:
+            print(f"{positions} positions solved in {time.perf_counter() - start:.0f}s", file=sys.stderr)
+
+    entries = build_opening_book(arguments.plies, Solver(arguments.table_size), progress=progress)
+    write_opening_book(arguments.output, entries)
+    print(f"Saved {len(entries)} positions to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
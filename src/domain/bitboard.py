@@ -0,0 +1,607 @@
+import functools
+import pickle
+import random
+import unittest
+from src.domain.board import Board
+from src.domain.geometry import get_geometry
+
+
+class TestBitBoard(unittest.TestCase):
+    def setUp(self):
+        self.bitboard = BitBoard()
+        self.grid = self.bitboard.reset_board()
+
+    def test_reset_board(self):
+        user, empty = '1', '0'
+        self.bitboard.play(1, user)
+        self.bitboard.reset_board()
+        self.assertEqual(self.grid[6][1], empty)
+        self.assertEqual(self.grid, Board().reset_board())
+
+    def test_play(self):
+        user, computer = '1', '2'
+        self.assertEqual(self.bitboard.play(1, user), 6)
+        self.assertEqual(self.bitboard.play(1, computer), 5)
+        self.assertEqual(self.grid[6][1], user)
+        self.assertEqual(self.grid[5][1], computer)
+
+    def test_undo(self):
+        user, empty = '1', '0'
+        self.bitboard.play(3, user)
+        self.assertEqual(self.bitboard.undo(), 3)
+        self.assertEqual(self.grid[6][3], empty)
+        self.assertEqual(self.bitboard.column_height(3), 0)
+
+    def test_can_play(self):
+        user = '1'
+        for _ in range(6):
+            self.assertTrue(self.bitboard.can_play(1))
+            self.bitboard.play(1, user)
+        self.assertFalse(self.bitboard.can_play(1))
+        self.assertIsNone(self.bitboard.next_open_row(1))
+
+    def test_is_winner(self):
+        user, computer = '1', '2'
+        for column in range(1, 5):
+            self.bitboard.play(column, user)
+        self.assertTrue(self.bitboard.is_winner(user))
+        self.assertFalse(self.bitboard.is_winner(computer))
+
+    def test_is_winner_diagonal(self):
+        user, computer = '1', '2'
+        for column in range(1, 5):
+            for _ in range(column - 1):
+                self.bitboard.play(column, computer)
+            self.bitboard.play(column, user)
+        self.assertTrue(self.bitboard.is_winner(user))
+
+    def test_no_wrap_around_columns(self):
+        user, computer = '1', '2'
+        for _ in range(3):
+            self.bitboard.play(1, computer)
+        for column in (1, 2, 2, 2):
+            self.bitboard.play(column, user)
+        self.assertFalse(self.bitboard.is_winner(user))
+
+    def test_from_grid(self):
+        user, computer = '1', '2'
+        board = Board().reset_board()
+        board[6][2], board[5][2], board[6][7] = user, computer, user
+        position = BitBoard.from_grid(board)
+        self.assertEqual(position.get_grid(), board)
+        self.assertEqual(position.get_valid_moves(), [1, 2, 3, 4, 5, 6, 7])
+
+    def test_last_move_result(self):
+        user, computer = '1', '2'
+        self.assertEqual(self.bitboard.last_move_result(), (False, None))
+        for column in range(1, 4):
+            self.bitboard.play(column, user)
+            self.bitboard.play(column, computer)
+        self.assertEqual(self.bitboard.last_move_result(), (False, None))
+        self.bitboard.play(4, user)
+        self.assertEqual(self.bitboard.last_move_result(), (True, user))
+
+    def test_hash_is_incremental(self):
+        user, computer = '1', '2'
+        empty_hash = self.bitboard.get_hash()
+        self.bitboard.play(4, user)
+        self.bitboard.play(3, computer)
+        played_hash = self.bitboard.get_hash()
+        self.assertEqual(played_hash, BitBoard.from_grid(self.grid).get_hash())
+        self.bitboard.undo()
+        self.bitboard.undo()
+        self.assertEqual(self.bitboard.get_hash(), empty_hash)
+
+    def test_hash_ignores_move_order(self):
+        user, computer = '1', '2'
+        other = BitBoard()
+        for column, player in ((1, user), (2, computer), (3, user), (4, computer)):
+            self.bitboard.play(column, player)
+        for column, player in ((3, user), (4, computer), (1, user), (2, computer)):
+            other.play(column, player)
+        self.assertEqual(self.bitboard.get_hash(), other.get_hash())
+
+    def test_mirror_column(self):
+        for column in range(1, 8):
+            self.assertEqual(self.bitboard.mirror_column(self.bitboard.mirror_column(column)), column)
+        self.assertEqual(self.bitboard.mirror_column(1), 7)
+        self.assertEqual(self.bitboard.mirror_column(4), 4)
+        self.assertEqual(BitBoard(7, 9, 5).mirror_column(2), 8)
+
+    def test_canonical_key_of_mirror(self):
+        user, computer = '1', '2'
+        for column, player in ((1, user), (2, computer), (2, user), (6, computer)):
+            self.bitboard.play(column, player)
+        mirrored = self.bitboard.mirrored()
+        key, is_mirrored = self.bitboard.get_canonical_key()
+        self.assertEqual(mirrored.get_canonical_key(), (key, not is_mirrored))
+        self.assertEqual(mirrored.get_grid()[6][7], user)
+        self.assertEqual(mirrored.get_grid()[5][6], user)
+
+    def test_canonical_key_of_player_to_move(self):
+        user, computer = '1', '2'
+        self.bitboard.play(2, user)
+        key, is_mirrored = self.bitboard.get_canonical_key(computer)
+        self.assertNotEqual(key, self.bitboard.get_canonical_key(user)[0])
+        self.assertNotEqual(key, self.bitboard.get_canonical_key()[0])
+        self.assertEqual(self.bitboard.mirrored().get_canonical_key(computer), (key, not is_mirrored))
+
+    def test_canonical_key_of_symmetric_position(self):
+        user, computer = '1', '2'
+        self.bitboard.play(4, user)
+        self.bitboard.play(4, computer)
+        self.assertEqual(self.bitboard.get_canonical_key(), (self.bitboard.get_hash(), False))
+
+    def test_mirrored_moves_round_trip(self):
+        user, computer = '1', '2'
+        for column, player in ((3, user), (3, computer), (7, user), (1, computer), (3, user)):
+            self.bitboard.play(column, player)
+        mirrored = self.bitboard.mirrored()
+        for column in range(1, 8):
+            self.assertEqual(mirrored.next_open_row(mirrored.mirror_column(column)),
+                             self.bitboard.next_open_row(column))
+            self.bitboard.play(column, user)
+            mirrored.play(mirrored.mirror_column(column), user)
+            self.assertEqual(mirrored.get_canonical_key()[0], self.bitboard.get_canonical_key()[0])
+            self.assertEqual(mirrored.mirrored().get_grid(), self.bitboard.get_grid())
+            self.bitboard.undo()
+            mirrored.undo()
+
+    def test_grid_assignment(self):
+        user, empty = '1', '0'
+        self.grid[6][4] = user
+        self.assertEqual(self.bitboard.next_open_row(4), 5)
+        self.grid[6][4] = empty
+        self.assertEqual(self.bitboard.next_open_row(4), 6)
+
+    def test_copy_from(self):
+        user, computer = '1', '2'
+        for column, player in ((4, user), (4, computer), (1, user)):
+            self.bitboard.play(column, player)
+        other = BitBoard()
+        self.assertIs(other.copy_from(self.bitboard), other.get_grid())
+        self.assertEqual(other.get_grid(), self.bitboard.get_grid())
+        self.assertEqual(other.get_canonical_key(), self.bitboard.get_canonical_key())
+        other.undo()
+        self.assertEqual(self.bitboard.get_grid()[6][1], user)
+        self.assertEqual(self.bitboard.get_moves(), [4, 4, 1])
+
+    def test_other_geometry(self):
+        user, computer = '1', '2'
+        bitboard = BitBoard(7, 9, 5)
+        self.assertEqual(bitboard.get_valid_moves(), list(range(1, 10)))
+        for column in range(5, 9):
+            bitboard.play(column, user)
+        self.assertFalse(bitboard.is_winner(user))
+        bitboard.play(9, user)
+        self.assertTrue(bitboard.is_winner(user))
+        for _ in range(6):
+            bitboard.play(1, computer)
+        self.assertEqual(bitboard.next_open_row(1), 1)
+        self.assertTrue(bitboard.is_winner(computer))
+        self.assertEqual(bitboard.mirror_column(1), 9)
+        self.assertEqual(bitboard.mirrored().get_grid()[7][1], user)
+        self.assertEqual(BitBoard.from_grid(bitboard.to_grid(), 5).get_grid(), bitboard.get_grid())
+        with self.assertRaises(ValueError):
+            BitBoard().copy_from(bitboard)
+
+    def test_winning_moves(self):
+        user, computer = '1', '2'
+        for column, player in ((1, user), (1, computer), (2, user), (2, computer), (3, user), (7, computer),
+                               (7, computer), (7, computer)):
+            self.bitboard.play(column, player)
+        self.assertEqual(self.bitboard.winning_moves(user), [4])
+        self.assertEqual(self.bitboard.winning_moves(computer), [7])
+        generator = random.Random(3)
+        for rows, columns, connect in ((6, 7, 4), (7, 9, 5), (5, 5, 3)):
+            bitboard = BitBoard(rows, columns, connect)
+            for move in range(rows * columns):
+                if bitboard.last_move_result()[0]:
+                    bitboard.reset_board()
+                for player in (user, computer):
+                    winning = []
+                    for column in bitboard.get_valid_moves():
+                        bitboard.play(column, player)
+                        if bitboard.is_winner(player):
+                            winning.append(column)
+                        bitboard.undo()
+                    # a column already won by the player counts too, like any other winning drop
+                    self.assertEqual(bitboard.winning_moves(player), winning)
+                bitboard.play(generator.choice(bitboard.get_valid_moves()), user if move % 2 == 0 else computer)
+
+    def test_threat_and_playable_masks(self):
+        user, computer = '1', '2'
+        for column in (1, 2, 3):
+            self.bitboard.play(column, computer)
+            self.bitboard.play(column, computer)
+        self.assertEqual(self.bitboard.cells_of(self.bitboard.threat_mask(computer)), [(6, 4), (5, 4)])
+        self.assertEqual(self.bitboard.cells_of(self.bitboard.playable_mask()),
+                         [(4, 1), (4, 2), (4, 3), (6, 4), (6, 5), (6, 6), (6, 7)])
+        self.assertEqual(self.bitboard.columns_of(self.bitboard.cell_mask(5, 4)), [4])
+        self.assertEqual(self.bitboard.threat_mask(user), 0)
+        self.assertEqual(self.bitboard.cells_of(self.bitboard.odd_rows_mask())[:4], [(6, 1), (4, 1), (2, 1), (6, 2)])
+
+    def test_load(self):
+        user, computer = '1', '2'
+        for column, player in ((4, user), (4, computer), (3, user)):
+            self.bitboard.play(column, player)
+        bitboard = BitBoard()
+        grid = bitboard.reset_board()
+        self.assertIs(bitboard.load(self.bitboard.get_pieces(user), self.bitboard.get_pieces(computer),
+                                    [(3, user)]), grid)
+        self.assertEqual(bitboard.get_hash(), self.bitboard.get_hash())
+        self.assertEqual(bitboard.get_canonical_key(), self.bitboard.get_canonical_key())
+        self.assertEqual(bitboard.undo(), 3)
+        self.assertEqual(bitboard.get_moves(), [])
+        self.assertEqual(grid[5][4], computer)
+
+    def test_pickle(self):
+        user, computer = '1', '2'
+        bitboard = BitBoard(7, 8, 4)
+        for column, player in ((8, user), (1, computer), (8, user)):
+            bitboard.play(column, player)
+        copy = pickle.loads(pickle.dumps(bitboard))
+        self.assertEqual(copy.get_grid(), bitboard.get_grid())
+        self.assertEqual((copy.geometry, copy.get_moves()), (bitboard.geometry, bitboard.get_moves()))
+        self.assertEqual(copy.get_canonical_key(), bitboard.get_canonical_key())
+        copy.undo()
+        self.assertEqual(copy.next_open_row(8), 6)
+
+    def test_grid_matches_board(self):
+        user, computer = '1', '2'
+        board = Board().reset_board()
+        for column, player in ((4, user), (4, computer), (1, user), (7, computer)):
+            row = self.bitboard.play(column, player)
+            board[row][column] = player
+        self.assertEqual(self.grid, board)
+        self.assertEqual(self.bitboard.to_grid(), board)
+
+
+def _create_zobrist_keys(cells, seed=20240229):
+    generator = random.Random(seed)
+    return {player: [generator.getrandbits(64) for _ in range(cells)] for player in ('1', '2')}
+
+
+def _mirror_zobrist_keys(keys, columns, column_bits):
+    # the key a piece contributes to the hash of the left-right mirrored board
+    return {player: [player_keys[(columns - 1 - index // column_bits) * column_bits + index % column_bits]
+                     for index in range(len(player_keys))] for player, player_keys in keys.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _zobrist_keys(rows, columns):
+    column_bits = rows + 1
+    keys = _create_zobrist_keys(columns * column_bits)
+    return keys, _mirror_zobrist_keys(keys, columns, column_bits)
+
+
+# xored into the hash of a position for the player to move, so the same pieces with the other player to move
+# get another key; a mirror image has the same player to move, so both hashes get the same term
+SIDE_TO_MOVE_KEYS = {player: keys[0] for player, keys in _create_zobrist_keys(1, seed=20240301).items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _board_masks(rows, columns):
+    # the bottom cell of every column, every playable cell, and the cells of the odd rows counted from the bottom
+    column_bits = rows + 1
+    bottom_mask = sum(1 << (column * column_bits) for column in range(columns))
+    odd_rows = sum(1 << height for height in range(0, rows, 2))
+    return bottom_mask, bottom_mask * ((1 << rows) - 1), bottom_mask * odd_rows
+
+
+class BitBoard:
+    """
+    Position stored as one integer per player. Every column owns seven bits, six playable
+    cells from the bottom up and one always-empty sentinel bit on top, so shifting a
+    bitboard never carries a piece over into the next column.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        self.geometry = get_geometry(rows, columns, connect)
+        self._columns = columns
+        self._rows = rows
+        self._column_bits = self._rows + 1
+        # vertical, horizontal, downward diagonal and upward diagonal neighbours
+        self._shifts = (1, self._column_bits, self._column_bits - 1, self._column_bits + 1)
+        self._column_mask = (1 << rows) - 1
+        # a run of `connect` pieces is found by doubling runs: 1, 2, 4, ... then the rest
+        self._run_steps = []
+        length = 1
+        while length < connect:
+            step = min(length, connect - length)
+            self._run_steps.append(step)
+            length += step
+        self._pieces = {'1': 0, '2': 0}
+        self._moves = []
+        self._hash = 0
+        self._mirrored_hash = 0
+        self._zobrist, self._mirrored_zobrist = _zobrist_keys(rows, columns)
+        self._bottom_mask, self._board_mask, self._odd_rows_mask = _board_masks(rows, columns)
+        self._grid = BitBoardGrid(self)
+
+    @classmethod
+    def from_grid(cls, grid, connect=4):
+        # the board size is taken from the grid, header row and column included
+        empty = '0'
+        bitboard = cls(len(grid) - 1, len(grid[0]) - 1, connect)
+        for row in range(1, bitboard._rows + 1):
+            for column in range(1, bitboard._columns + 1):
+                if grid[row][column] != empty:
+                    bitboard.set_cell(row, column, grid[row][column])
+        return bitboard
+
+    def reset_board(self):
+        self._pieces['1'] = 0
+        self._pieces['2'] = 0
+        self._moves.clear()
+        self._hash = 0
+        self._mirrored_hash = 0
+        return self._grid
+
+    def copy_from(self, other):
+        # loads another position in place, so views handed out by reset_board stay valid
+        if other.geometry != self.geometry:
+            raise ValueError("Positions of different board sizes")
+        self._pieces['1'] = other._pieces['1']
+        self._pieces['2'] = other._pieces['2']
+        self._moves[:] = other._moves
+        self._hash = other._hash
+        self._mirrored_hash = other._mirrored_hash
+        return self._grid
+
+    def load(self, user_pieces, computer_pieces, moves=()):
+        # loads a position given as the pieces of both players in place; moves are the (column, player)
+        # of the last pieces played, the ones undo can take back
+        self._pieces['1'], self._pieces['2'] = user_pieces, computer_pieces
+        self._moves[:] = moves
+        self._hash = self._mirrored_hash = 0
+        for player, pieces in self._pieces.items():
+            while pieces:
+                index = (pieces & -pieces).bit_length() - 1
+                self._hash ^= self._zobrist[player][index]
+                self._mirrored_hash ^= self._mirrored_zobrist[player][index]
+                pieces &= pieces - 1
+        return self._grid
+
+    def __reduce__(self):
+        # pickled as size and pieces only; the hash keys are looked up again by the receiving process
+        return _restore_bitboard, (self._rows, self._columns, self.geometry.connect, self._pieces['1'],
+                                   self._pieces['2'], self._moves, self._hash, self._mirrored_hash)
+
+    def _cell_index(self, row, column):
+        return (column - 1) * self._column_bits + self._rows - row
+
+    def get_cell(self, row, column):
+        if row == 0:
+            return chr(ord('A') + column - 1) if column > 0 else ' '
+        if column == 0:
+            return str(row)
+        bit = 1 << self._cell_index(row, column)
+        if self._pieces['1'] & bit:
+            return '1'
+        if self._pieces['2'] & bit:
+            return '2'
+        return '0'
+
+    def set_cell(self, row, column, value):
+        if row < 1 or column < 1:
+            raise IndexError("Header cells can't be changed")
+        index = self._cell_index(row, column)
+        bit = 1 << index
+        for player, pieces in self._pieces.items():
+            if pieces & bit:
+                self._pieces[player] = pieces & ~bit
+                self._hash ^= self._zobrist[player][index]
+                self._mirrored_hash ^= self._mirrored_zobrist[player][index]
+        if value in self._pieces:
+            self._pieces[value] |= bit
+            self._hash ^= self._zobrist[value][index]
+            self._mirrored_hash ^= self._mirrored_zobrist[value][index]
+
+    def get_hash(self):
+        return self._hash
+
+    def get_canonical_key(self, player_to_move=None):
+        # a position and its mirror image share the smaller of their two hashes
+        side = SIDE_TO_MOVE_KEYS[player_to_move] if player_to_move is not None else 0
+        if self._mirrored_hash ^ side < self._hash ^ side:
+            return self._mirrored_hash ^ side, True
+        return self._hash ^ side, False
+
+    def mirror_column(self, column):
+        return self._columns + 1 - column
+
+    def mirrored(self):
+        bitboard = BitBoard(self._rows, self._columns, self.geometry.connect)
+        for column in range(1, self._columns + 1):
+            for row in range(1, self._rows + 1):
+                bitboard.set_cell(row, self.mirror_column(column), self.get_cell(row, column))
+        return bitboard
+
+    def get_grid(self):
+        return self._grid
+
+    def get_pieces(self, player):
+        return self._pieces[player]
+
+    def get_moves(self):
+        # the columns played since the last reset, in order (cells set directly aren't moves)
+        return [column for column, _ in self._moves]
+
+    def get_mask(self):
+        return self._pieces['1'] | self._pieces['2']
+
+    def column_height(self, column):
+        if column < 1 or column > self._columns:
+            raise IndexError("Column out of range")
+        column_mask = (1 << self._rows) - 1
+        return ((self.get_mask() >> ((column - 1) * self._column_bits)) & column_mask).bit_length()
+
+    def can_play(self, column):
+        return self.column_height(column) < self._rows
+
+    def next_open_row(self, column):
+        height = self.column_height(column)
+        if height == self._rows:
+            return None
+        return self._rows - height
+
+    def play(self, column, player):
+        height = self.column_height(column)
+        index = (column - 1) * self._column_bits + height
+        self._pieces[player] |= 1 << index
+        self._hash ^= self._zobrist[player][index]
+        self._mirrored_hash ^= self._mirrored_zobrist[player][index]
+        self._moves.append((column, player))
+        return self._rows - height
+
+    def undo(self):
+        column, player = self._moves.pop()
+        index = (column - 1) * self._column_bits + self.column_height(column) - 1
+        self._pieces[player] &= ~(1 << index)
+        self._hash ^= self._zobrist[player][index]
+        self._mirrored_hash ^= self._mirrored_zobrist[player][index]
+        return column
+
+    def is_winner(self, player):
+        pieces = self._pieces[player]
+        for shift in self._shifts:
+            run = pieces
+            for step in self._run_steps:
+                run &= run >> (step * shift)
+            if run:
+                return True
+        return False
+
+    def threat_mask(self, player):
+        # every empty cell where a piece of the player would complete a line, found for all cells at
+        # once: a cell wins when it has k of the player's pieces in a row on one side and connect - 1 - k
+        # on the other
+        pieces = self._pieces[player]
+        if self.geometry.connect == 4:
+            # the usual game, unrolled: three below, or three, two or one on one side and the rest on the other
+            cells = (pieces << 1) & (pieces << 2) & (pieces << 3)
+            for shift in self._shifts[1:]:
+                pair = (pieces << shift) & (pieces << 2 * shift)
+                cells |= pair & ((pieces << 3 * shift) | (pieces >> shift))
+                pair = (pieces >> shift) & (pieces >> 2 * shift)
+                cells |= pair & ((pieces >> 3 * shift) | (pieces << shift))
+        else:
+            length = self.geometry.connect - 1
+            cells = 0
+            for shift in self._shifts:
+                before = after = -1
+                runs_before = [before]
+                runs_after = [after]
+                for distance in range(shift, shift * length + 1, shift):
+                    before &= pieces << distance
+                    after &= pieces >> distance
+                    runs_before.append(before)
+                    runs_after.append(after)
+                for count in range(length + 1):
+                    cells |= runs_before[count] & runs_after[length - count]
+        return cells & self._board_mask & ~self.get_mask()
+
+    def playable_mask(self):
+        # the lowest empty cell of every column that isn't full
+        return (self.get_mask() + self._bottom_mask) & self._board_mask
+
+    def winning_moves(self, player):
+        # columns where the player's next piece completes a line
+        return self.columns_of(self.threat_mask(player) & self.playable_mask())
+
+    def odd_rows_mask(self):
+        return self._odd_rows_mask
+
+    def cell_mask(self, row, column):
+        return 1 << self._cell_index(row, column)
+
+    def columns_of(self, mask):
+        return [column for column in range(1, self._columns + 1) if mask >> ((column - 1) * self._column_bits)
+                & self._column_mask] if mask else []
+
+    def cells_of(self, mask):
+        # the (row, column) of every cell of the mask, column by column from the bottom up
+        cells = []
+        while mask:
+            index = (mask & -mask).bit_length() - 1
+            cells.append((self._rows - index % self._column_bits, index // self._column_bits + 1))
+            mask &= mask - 1
+        return cells
+
+    def is_full(self):
+        return self.get_mask().bit_count() == self._rows * self._columns
+
+    def get_valid_moves(self):
+        return [column for column in range(1, self._columns + 1) if self.can_play(column)]
+
+    def last_move_result(self):
+        # only the player who dropped the last piece can have completed a line with it
+        if self._moves:
+            player = self._moves[-1][1]
+            if self.is_winner(player):
+                return True, player
+        return self.is_full(), None
+
+    def to_grid(self):
+        return [[self.get_cell(row, column) for column in range(self._columns + 1)]
+                for row in range(self._rows + 1)]
+
+
+def _restore_bitboard(rows, columns, connect, user_pieces, computer_pieces, moves, position_hash, mirrored_hash):
+    bitboard = BitBoard(rows, columns, connect)
+    bitboard._pieces['1'], bitboard._pieces['2'] = user_pieces, computer_pieces
+    bitboard._moves[:] = moves
+    bitboard._hash, bitboard._mirrored_hash = position_hash, mirrored_hash
+    return bitboard
+
+
+class BitBoardGrid:
+    """
+    Read/write view that exposes a BitBoard with the same [row][column] layout as Board,
+    header row and header column included.
+    """
+
+    def __init__(self, bitboard):
+        self._bitboard = bitboard
+        self._grid_rows = [BitBoardRow(bitboard, row) for row in range(bitboard._rows + 1)]
+
+    def __len__(self):
+        return len(self._grid_rows)
+
+    def __getitem__(self, row):
+        return self._grid_rows[row]
+
+    def __iter__(self):
+        return iter(self._grid_rows)
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+
+class BitBoardRow:
+    def __init__(self, bitboard, row):
+        self._bitboard = bitboard
+        self._row = row
+        self._length = bitboard._columns + 1
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, column):
+        if isinstance(column, slice):
+            return [self._bitboard.get_cell(self._row, index) for index in range(self._length)[column]]
+        return self._bitboard.get_cell(self._row, range(self._length)[column])
+
+    def __setitem__(self, column, value):
+        self._bitboard.set_cell(self._row, range(self._length)[column], value)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+if __name__ == '__main__':
+    unittest.main()
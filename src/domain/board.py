@@ -1,4 +1,5 @@
 import unittest
+from src.domain.geometry import get_geometry
 
 
 class TestBoard(unittest.TestCase):
@@ -20,6 +21,11 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(self.board._board[1][0], user)
         self.assertEqual(self.board._board[1][1], empty)
 
+    def test_other_size(self):
+        board = Board(7, 9, 5).reset_board()
+        self.assertEqual((len(board), len(board[0])), (8, 10))
+        self.assertEqual((board[0][9], board[7][0], board[7][9]), ('I', '7', '0'))
+
     def test_reset_board(self):
         user, empty = '1', '0'
         self.board._board[1][1] = user
@@ -28,9 +34,11 @@ class TestBoard(unittest.TestCase):
 
 
 class Board:
-    def __init__(self):
-        self._columns = 8
-        self._rows = 7
+    def __init__(self, rows=6, columns=7, connect=4):
+        self.geometry = get_geometry(rows, columns, connect)
+        # one more row and column for the headers
+        self._columns = columns + 1
+        self._rows = rows + 1
         self._board = [[' ' for _ in range(self._columns)] for _ in range(self._rows)]
         self._initialize_board()
 
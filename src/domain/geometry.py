@@ -0,0 +1,93 @@
+import functools
+import unittest
+
+
+class TestGeometry(unittest.TestCase):
+    def test_standard_lines(self):
+        lines, cells = 69, 42
+        geometry = get_geometry()
+        self.assertEqual(len(geometry.lines), lines)
+        self.assertEqual(len(geometry.lines_through_cell), cells)
+        self.assertEqual(len(geometry.lines_through_cell[(3, 4)]), 13)
+        self.assertEqual(len(geometry.lines_through_cell[(1, 1)]), 3)
+        self.assertTrue(all(len(line) == geometry.connect for line in geometry.lines))
+
+    def test_other_sizes(self):
+        geometry = get_geometry(7, 9, 5)
+        # 5 horizontal and 3 vertical lines per row and column, 2 x 3 x 5 diagonals
+        self.assertEqual(len(geometry.lines), 7 * 5 + 9 * 3 + 2 * 3 * 5)
+        self.assertEqual(geometry.center_column, 5)
+        self.assertEqual(get_geometry(7, 8).center_column, 5)
+        self.assertEqual(geometry.center_columns, (5,))
+        self.assertEqual(get_geometry(7, 8).center_columns, (4, 5))
+        self.assertIn(((7, 1), (6, 2), (5, 3), (4, 4), (3, 5)), geometry.lines_through_cell[(5, 3)])
+
+    def test_shared_and_comparable(self):
+        self.assertIs(get_geometry(7, 8, 4), get_geometry(7, 8, 4))
+        self.assertEqual(Geometry(), STANDARD_GEOMETRY)
+        self.assertNotEqual(get_geometry(7, 8), STANDARD_GEOMETRY)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Geometry(4, 4, 5)
+        with self.assertRaises(ValueError):
+            Geometry(6, 16, 4)
+
+
+class Geometry:
+    """
+    Board size and number of pieces in a row that wins. Every line of `connect` cells is
+    listed once, as grid coordinates (row 1 on top, column 1 on the left), and indexed by
+    the cells it goes through, so a move only has to look at the lines of its own cell.
+    """
+
+    def __init__(self, rows=6, columns=7, connect=4):
+        # columns are stored in four bits by the game records
+        maximum_columns = 15
+        if rows < 1 or not 1 <= columns <= maximum_columns or connect < 2 or connect > max(rows, columns):
+            raise ValueError("Invalid board geometry")
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.center_column = columns // 2 + 1
+        # the columns whose pieces score a bonus, both middle ones on an even width so a position and its
+        # mirror image score the same
+        self.center_columns = (self.center_column,) if columns % 2 else (self.center_column - 1, self.center_column)
+        self.lines = []
+        for row in range(1, rows + 1):
+            for column in range(1, columns + 1):
+                # horizontal, vertical, upward diagonal and downward diagonal lines starting here
+                for row_step, column_step in ((0, 1), (1, 0), (-1, 1), (1, 1)):
+                    end_row = row + row_step * (connect - 1)
+                    end_column = column + column_step * (connect - 1)
+                    if 1 <= end_row <= rows and end_column <= columns:
+                        self.lines.append(tuple((row + row_step * i, column + column_step * i)
+                                                for i in range(connect)))
+        self.lines_through_cell = {(row, column): [] for row in range(1, rows + 1)
+                                   for column in range(1, columns + 1)}
+        for line in self.lines:
+            for cell in line:
+                self.lines_through_cell[cell].append(line)
+
+    def __eq__(self, other):
+        return isinstance(other, Geometry) and \
+            (self.rows, self.columns, self.connect) == (other.rows, other.columns, other.connect)
+
+    def __hash__(self):
+        return hash((self.rows, self.columns, self.connect))
+
+    def __repr__(self):
+        return f"Geometry({self.rows}, {self.columns}, {self.connect})"
+
+
+@functools.lru_cache(maxsize=None)
+def get_geometry(rows=6, columns=7, connect=4):
+    # the line tables are built once per board size and shared by every board of that size
+    return Geometry(rows, columns, connect)
+
+
+STANDARD_GEOMETRY = get_geometry()
+
+
+if __name__ == '__main__':
+    unittest.main()
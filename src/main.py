@@ -1,4 +1,4 @@
-from src.domain.board import Board
+from src.domain.bitboard import BitBoard
 from src.repository.board_repository import BoardActions, ComputerStrategy
 from src.services.services import Services
 from src.ui.user_interface import UserInterface
@@ -6,11 +6,13 @@ from src.repository.GUI_repository import GUIBoardRepository
 import tkinter as tkinter
 
 def main():
-    board = Board()
+    board = BitBoard()
     board_action = BoardActions(board, None)
     computer_strategy = ComputerStrategy(board_action)
     board_action.computer_strategy = computer_strategy
     services = Services(board_action)
+    # seconds the Godlike, Perfect and Monte Carlo levels may think per move
+    time_budget = 0.1
 
     while True:
         try:
@@ -27,8 +29,9 @@ def main():
         while True:
             try:
                 difficulty = int(
-                    input("Choose computer's difficulty level (1: Easy, 2: Medium, 3: Hard, 4: Godlike): "))
-                if difficulty not in [1, 2, 3, 4]:
+                    input("Choose computer's difficulty level (1: Easy, 2: Medium, 3: Hard, 4: Godlike, 5: Perfect, "
+                          "6: Monte Carlo): "))
+                if difficulty not in [1, 2, 3, 4, 5, 6]:
                     raise ValueError("Invalid option")
                 break
             except ValueError as value_error:
@@ -37,12 +40,12 @@ def main():
     console_interface, gui_interface = '1', '2'
 
     if choice == console_interface:
-        user_interface = UserInterface(services)
+        user_interface = UserInterface(services, time_budget)
         user_interface.run_program()
     elif choice == gui_interface:
         root = tkinter.Tk()
         root.title("Connect Four")
-        gui = GUIBoardRepository(root, board_action, difficulty)
+        gui = GUIBoardRepository(root, board_action, difficulty, time_budget)
         root.mainloop()
     else:
         print("Invalid choice. Please restart the program and choose a valid option.")
@@ -1,20 +1,134 @@
+import queue
+import threading
+import time
 import tkinter
+import unittest
 from tkinter import messagebox
-from src.repository.board_repository import BoardException
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, BoardException, ComputerStrategy, SearchCancelled
+from src.repository.opening_book import DEFAULT_BOOK_PATH
+
+
+class TestComputerMoveWorker(unittest.TestCase):
+    def setUp(self):
+        self.board_action = BoardActions(BitBoard(), None)
+        self.worker = ComputerMoveWorker(self.board_action, opening_book_path=None)
+
+    def wait(self):
+        timeout = 10
+        start = time.perf_counter()
+        while self.worker.is_busy() and time.perf_counter() - start < timeout:
+            time.sleep(0.01)
+        self.assertFalse(self.worker.is_busy())
+
+    def test_move_found_in_background(self):
+        user, hard = '1', 3
+        for column in (1, 2, 3):
+            self.board_action.add_move_on_board(column, user)
+        self.worker.start(self.board_action.get_position(), hard)
+        self.wait()
+        self.assertEqual(self.worker.poll(), 4)
+        self.assertIsNone(self.worker.poll())
+        # the search ran on the worker's own copy of the board
+        self.assertEqual(self.board_action.get_position().get_moves(), [1, 2, 3])
+
+    def test_cancel(self):
+        user, computer, godlike, time_budget = '1', '2', 4, 30
+        for column, player in ((4, user), (4, computer)):
+            self.board_action.add_move_on_board(column, player)
+        self.worker.start(self.board_action.get_position(), godlike, time_budget)
+        self.assertTrue(self.worker.is_busy())
+        self.worker.cancel()
+        self.wait()
+        self.assertIsNone(self.worker.poll())
+        self.worker.start(self.board_action.get_position(), godlike)
+        self.wait()
+        self.assertIn(self.worker.poll(), range(1, 8))
+        seconds, depth, nodes = self.worker.progress()
+        self.assertGreater(nodes, 0)
+
+
+class ComputerMoveWorker:
+    """
+    Finds the computer's move in a background thread, on its own copy of the board, so the Tk
+    event loop keeps running during long searches. Its methods are called from the Tk thread
+    only: the search thread hands the move back through a queue that the window polls with
+    root.after. Cancelling, or starting another search, drops whatever the last one finds.
+    """
+
+    def __init__(self, board_action, opening_book_path=DEFAULT_BOOK_PATH):
+        geometry = board_action.geometry
+        self.position = BitBoard(geometry.rows, geometry.columns, geometry.connect)
+        search_action = BoardActions(self.position, None)
+        self.computer_strategy = ComputerStrategy(search_action, opening_book_path=opening_book_path)
+        search_action.computer_strategy = self.computer_strategy
+        self.computer_strategy.enable_statistics()
+        self._results = queue.Queue()
+        self._thread = None
+        self._search = 0
+        self._start = (time.perf_counter(), 0)
+
+    def is_busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, position, difficulty, time_budget=None):
+        if self.is_busy():
+            raise RuntimeError("The previous search hasn't stopped yet")
+        self.position.copy_from(position)
+        self.computer_strategy.cancelled = False
+        self._search += 1
+        self._start = (time.perf_counter(), self.computer_strategy.nodes)
+        self._thread = threading.Thread(target=self._run, args=(self._search, difficulty, time_budget), daemon=True)
+        self._thread.start()
+
+    def _run(self, search, difficulty, time_budget):
+        try:
+            column = self.computer_strategy.set_computer_difficulty(difficulty, time_budget)
+        except SearchCancelled:
+            column = None
+        self._results.put((search, column))
+
+    def cancel(self):
+        self._search += 1
+        self.computer_strategy.cancel()
+
+    def poll(self):
+        # the move of the current search once it is found, otherwise None
+        while True:
+            try:
+                search, column = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            if search == self._search and column is not None:
+                return column
+
+    def progress(self):
+        # seconds spent, deepest finished search depth and positions searched since the search started
+        start, nodes = self._start
+        statistics = self.computer_strategy.statistics or self.computer_strategy.last_statistics
+        return time.perf_counter() - start, statistics.depth if statistics is not None else 0, \
+            self.computer_strategy.nodes - nodes
 
 
 class GUIBoardRepository:
-    def __init__(self, root, board_action, difficulty):
+    def __init__(self, root, board_action, difficulty, time_budget=None):
         self.root = root
         self.board_action = board_action
-        self.__rows = 6
-        self.__columns = 7
+        self.__rows = board_action.geometry.rows
+        self.__columns = board_action.geometry.columns
         self.buttons = [[' ' for _ in range(self.__columns)] for _ in range(self.__rows)]
+        self.__colors = [['white' for _ in range(self.__columns)] for _ in range(self.__rows)]
         self.__difficulty = difficulty
+        self.__time_budget = time_budget
+        computer_strategy = board_action.computer_strategy
+        self.worker = ComputerMoveWorker(board_action, computer_strategy.opening_book_path
+                                         if computer_strategy is not None else DEFAULT_BOOK_PATH)
+        self.__poll_id = None
+        self.status = None
         self.create_board()
 
     def create_board(self):
-        rows, columns = 6, 7
+        rows, columns = self.__rows, self.__columns
         for column in range(columns):
             label = tkinter.Label(self.root, text=chr(ord('A') + column), width=10, height=3)
             label.grid(row=0, column=column + 1)
@@ -28,33 +142,80 @@ class GUIBoardRepository:
                 button.grid(row=row + 1, column=column + 1)
                 self.buttons[row][column] = button
 
+        restart = tkinter.Button(self.root, text="New game", width=10, command=self.restart)
+        restart.grid(row=rows + 1, column=0)
+        self.status = tkinter.Label(self.root, text='', anchor='w')
+        self.status.grid(row=rows + 1, column=1, columnspan=columns, sticky='we')
+
     def make_move(self, row, column):
-        user, computer = '1', '2'
+        user = '1'
+        if self.__poll_id is not None or self.worker.is_busy():
+            # the board is the computer's until its move is in, even once the search thread has ended, and
+            # a search cancelled by a restart may still be unwinding
+            return
         try:
-            self.board_action.add_move_on_board(column + 1, '1')
+            self.board_action.add_move_on_board(column + 1, user)
             self.update_board(user)
             if self.board_action.is_game_over()[0]:
                 messagebox.showinfo("Game Over", "User wins!")
-                self.board_action.restart_game()
-                self.update_board()
+                self.restart()
             else:
-                self.board_action.computer_move(self.__difficulty)
-                self.update_board(computer)
-                if self.board_action.is_game_over()[0]:
-                    messagebox.showinfo("Game Over", "Computer wins!")
-                    self.board_action.restart_game()
-                    self.update_board()
+                self.worker.start(self.board_action.get_position(), self.__difficulty, self.__time_budget)
+                self.__poll_computer_move()
         except BoardException as exception:
             messagebox.showerror("Error", str(exception))
 
+    def __poll_computer_move(self):
+        computer, poll_interval = '2', 50
+        # checked before polling, so a move handed over in between is found on the next poll
+        busy = self.worker.is_busy()
+        column = self.worker.poll()
+        if column is None:
+            self.__poll_id = self.root.after(poll_interval, self.__poll_computer_move) if busy else None
+            self.show_progress(busy)
+            return
+        self.__poll_id = None
+        self.show_progress(False)
+        self.board_action.add_move_on_board(column, computer)
+        self.update_board(computer)
+        if self.board_action.is_game_over()[0]:
+            messagebox.showinfo("Game Over", "Computer wins!")
+            self.restart()
+
+    def show_progress(self, thinking):
+        if not thinking:
+            self.status.config(text='')
+            return
+        seconds, depth, nodes = self.worker.progress()
+        text = f"Computer is thinking... {seconds:.1f} s"
+        if depth:
+            text += f", depth {depth}"
+        if nodes:
+            text += f", {nodes:,} positions"
+        self.status.config(text=text)
+
+    def restart(self):
+        # a search still running is cancelled and its move thrown away
+        self.worker.cancel()
+        if self.__poll_id is not None:
+            self.root.after_cancel(self.__poll_id)
+            self.__poll_id = None
+        self.show_progress(False)
+        self.board_action.restart_game()
+        self.update_board()
+
     def update_board(self, player=None):
-        rows, columns = 7, 8
+        # only the buttons whose colour changed are reconfigured
+        rows, columns = self.__rows + 1, self.__columns + 1
+        colors = {'1': 'blue', '2': 'red'}
         board = self.board_action.get_board()
         for row in range(1, rows):
             for column in range(1, columns):
-                if board[row][column] == '1':
-                    self.buttons[row - 1][column - 1].config(bg='blue')
-                elif board[row][column] == '2':
-                    self.buttons[row - 1][column - 1].config(bg='red')
-                else:
-                    self.buttons[row - 1][column - 1].config(bg='white')
+                color = colors.get(board[row][column], 'white')
+                if self.__colors[row - 1][column - 1] != color:
+                    self.buttons[row - 1][column - 1].config(bg=color)
+                    self.__colors[row - 1][column - 1] = color
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import random
+import unittest
+import numpy
+from numpy.lib.stride_tricks import sliding_window_view
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy
+
+EMPTY, USER, COMPUTER = 0, 1, 2
+PIECE_VALUES = {'0': EMPTY, '1': USER, '2': COMPUTER}
+
+
+class TestBatchEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.board_action = BoardActions(BitBoard(), None)
+        self.computer_strategy = ComputerStrategy(self.board_action)
+
+    def random_corpus(self, games, seed):
+        generator = random.Random(seed)
+        grids = []
+        for _ in range(games):
+            self.board_action.restart_game()
+            # games go on after a win so that boards with several lines are covered too
+            for move in range(generator.randint(0, 42)):
+                valid_moves = self.computer_strategy.get_valid_moves()
+                if not valid_moves:
+                    break
+                self.board_action.add_move_on_board(generator.choice(valid_moves), '1' if move % 2 == 0 else '2')
+            grids.append([list(row) for row in self.board_action.get_board()])
+        return grids
+
+    def test_grids_to_array(self):
+        self.board_action.add_move_on_board(2, '1')
+        positions = grids_to_array([self.board_action.get_board()])
+        self.assertEqual(positions.shape, (1, 6, 7))
+        self.assertEqual(positions.dtype, numpy.int8)
+        self.assertEqual(positions[0, 5, 1], USER)
+        self.assertEqual(int(positions.sum()), USER)
+
+    def test_matches_scalar_methods(self):
+        grids = self.random_corpus(300, 3)
+        positions = grids_to_array(grids)
+        for player in ('1', '2'):
+            wins = batch_check_winner(positions, player)
+            scores = batch_score_positions(positions, player)
+            for index, grid in enumerate(grids):
+                board = self.board_action.restart_game()
+                for row in range(1, 7):
+                    for column in range(1, 8):
+                        board[row][column] = grid[row][column]
+                self.assertEqual(bool(wins[index]), self.board_action.check_winner(player))
+                self.assertEqual(int(scores[index]), self.computer_strategy.score_position(grid, player))
+
+    def test_evaluate_positions(self):
+        positions = numpy.zeros((4, 6, 7), dtype=numpy.int8)
+        positions[1, 5, 0:4] = USER
+        wins, scores = evaluate_positions(positions, '2')
+        self.assertEqual(wins.tolist(), [[False, False], [True, False], [False, False], [False, False]])
+        self.assertEqual(scores.tolist(), [0, -4, 0, 0])
+
+
+def grids_to_array(grids):
+    rows, columns = 6, 7
+    positions = numpy.zeros((len(grids), rows, columns), dtype=numpy.int8)
+    for index, grid in enumerate(grids):
+        for row in range(rows):
+            for column in range(columns):
+                positions[index, row, column] = PIECE_VALUES[grid[row + 1][column + 1]]
+    return positions
+
+
+def _windows(positions):
+    # every window of four cells as an (N, 69, 4) array: strided views of rows, columns and 4x4 blocks
+    piece_alignment = 4
+    count = positions.shape[0]
+    horizontal = sliding_window_view(positions, piece_alignment, axis=2).reshape(count, -1, piece_alignment)
+    vertical = sliding_window_view(positions, piece_alignment, axis=1).reshape(count, -1, piece_alignment)
+    blocks = sliding_window_view(positions, (piece_alignment, piece_alignment), axis=(1, 2))
+    diagonal = numpy.diagonal(blocks, axis1=-2, axis2=-1).reshape(count, -1, piece_alignment)
+    anti_diagonal = numpy.diagonal(blocks[..., ::-1, :], axis1=-2, axis2=-1).reshape(count, -1, piece_alignment)
+    return numpy.concatenate((horizontal, vertical, diagonal, anti_diagonal), axis=1)
+
+
+def _window_score_table():
+    # the weights of ComputerStrategy.evaluate_window indexed by [own pieces, opponent pieces]
+    piece_alignment = 4
+    table = numpy.zeros((piece_alignment + 1, piece_alignment + 1), dtype=numpy.int64)
+    for own in range(piece_alignment + 1):
+        for other in range(piece_alignment + 1 - own):
+            window = ['2'] * own + ['1'] * other + ['0'] * (piece_alignment - own - other)
+            table[own, other] = ComputerStrategy.evaluate_window(window, '2')
+    return table
+
+
+WINDOW_SCORES = _window_score_table()
+
+
+def _winners(windows, player):
+    piece_alignment = 4
+    return ((windows == PIECE_VALUES[player]).sum(axis=2, dtype=numpy.int8) == piece_alignment).any(axis=1)
+
+
+def _scores(positions, windows, player):
+    center_weight, columns = 3, 7
+    own_piece = PIECE_VALUES[player]
+    other_piece = USER if own_piece == COMPUTER else COMPUTER
+    own = (windows == own_piece).sum(axis=2, dtype=numpy.int8)
+    other = (windows == other_piece).sum(axis=2, dtype=numpy.int8)
+    center = (positions[:, :, columns // 2] == own_piece).sum(axis=1)
+    return WINDOW_SCORES[own, other].sum(axis=1) + center_weight * center
+
+
+def batch_check_winner(positions, player):
+    return _winners(_windows(numpy.asarray(positions, dtype=numpy.int8)), player)
+
+
+def batch_score_positions(positions, player):
+    positions = numpy.asarray(positions, dtype=numpy.int8)
+    return _scores(positions, _windows(positions), player)
+
+
+def evaluate_positions(positions, player):
+    positions = numpy.asarray(positions, dtype=numpy.int8)
+    windows = _windows(positions)
+    wins = numpy.stack((_winners(windows, '1'), _winners(windows, '2')), axis=1)
+    return wins, _scores(positions, windows, player)
+
+if __name__ == '__main__':
+    unittest.main()
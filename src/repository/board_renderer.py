@@ -0,0 +1,98 @@
+import random
+import unittest
+from src.domain.board import Board
+from src.domain.bitboard import BitBoard
+
+
+class TestBoardRenderer(unittest.TestCase):
+    @staticmethod
+    def draw_with_texttable(grid):
+        import texttable
+        table = texttable.Texttable()
+        table.add_rows([list(row) for row in grid])
+        return table.draw()
+
+    def test_same_as_texttable(self):
+        user, computer = '1', '2'
+        generator = random.Random(1)
+        for rows, columns in ((6, 7), (7, 9), (1, 2), (12, 15), (10, 4)):
+            for board in (Board(rows, columns, 2), BitBoard(rows, columns, 2)):
+                grid = board.reset_board()
+                for move in range(generator.randrange(rows * columns)):
+                    row, column = generator.randrange(1, rows + 1), generator.randrange(1, columns + 1)
+                    grid[row][column] = user if move % 2 == 0 else computer
+                self.assertEqual(render_board(grid), self.draw_with_texttable(grid))
+
+    def test_template_is_cached(self):
+        user = '1'
+        renderer = BoardRenderer()
+        board = Board()
+        grid = board.reset_board()
+        renderer.render(grid)
+        grid[6][4] = user
+        self.assertEqual(renderer.render(grid), self.draw_with_texttable(grid))
+        self.assertEqual(len(renderer._templates), 1)
+
+    def test_other_cells_fall_back_to_texttable(self):
+        grid = Board().reset_board()
+        grid[6][4] = 'XX'
+        self.assertEqual(render_board(grid), self.draw_with_texttable(grid))
+
+
+class BoardRenderer:
+    """
+    Draws a board grid exactly as texttable does, header row and row numbers included. The frame
+    is formatted once per set of headers into a template, so every board only substitutes its
+    cells. Grids with cells other than single characters are left to texttable.
+    """
+
+    def __init__(self):
+        self._templates = {}
+
+    def render(self, grid):
+        rows = [list(row) for row in grid]
+        cells = tuple(cell for row in rows[1:] for cell in row[1:])
+        if not all(isinstance(cell, str) and len(cell) == 1 for cell in cells):
+            return _draw_with_texttable(rows)
+        headers = (tuple(str(cell) for cell in rows[0]), tuple(str(row[0]) for row in rows[1:]))
+        template = self._templates.get(headers)
+        if template is None:
+            template = self._templates[headers] = _frame_template(*headers)
+        return template % cells
+
+
+def _frame_template(column_headers, row_headers):
+    # every column is as wide as its longest entry, the board cells being one character wide
+    widths = [max(len(header) for header in (column_headers[0],) + row_headers)] + \
+             [max(len(header), 1) for header in column_headers[1:]]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+
+    def line(cells):
+        return '| ' + ' | '.join(cells) + ' |'
+
+    lines = [border, line(header.ljust(width).replace('%', '%%') for header, width in zip(column_headers, widths)),
+             border.replace('-', '=')]
+    cell_placeholders = ['%s' + ' ' * (width - 1) for width in widths[1:]]
+    for row_header in row_headers:
+        lines.append(line([row_header.ljust(widths[0]).replace('%', '%%')] + cell_placeholders))
+        lines.append(border)
+    return '\n'.join(lines)
+
+
+def _draw_with_texttable(rows):
+    # only loaded when a grid can't use the template
+    import texttable
+    table = texttable.Texttable()
+    table.add_rows(rows)
+    return table.draw()
+
+
+_renderer = BoardRenderer()
+
+
+def render_board(grid):
+    return _renderer.render(grid)
+
+
+if __name__ == '__main__':
+    unittest.main()
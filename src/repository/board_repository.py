@@ -1,9 +1,20 @@
-import copy
 import math
+import os
 import random
+import tempfile
+import time
 import unittest
 from src.domain.board import Board
-import texttable
+from src.domain.bitboard import BitBoard
+from src.domain.geometry import STANDARD_GEOMETRY
+from src.repository.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from src.repository.solver import Solver, SolverTimeout, book_move, canonical_key
+from src.repository.opening_book import OpeningBook, DEFAULT_BOOK_PATH, write_opening_book
+from src.repository.window_evaluator import WindowEvaluator
+from src.repository.search_statistics import SearchStatistics
+from src.repository.threat_analysis import ThreatAnalysis
+from src.repository.mcts import MonteCarloTreeSearch
+from src.repository.evaluation_cache import EvaluationCache, EVALUATION_CACHE
 
 
 class BoardException(Exception):
@@ -14,6 +25,14 @@ class BoardException(Exception):
         return self.message
 
 
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchCancelled(Exception):
+    pass
+
+
 class TestBoardActions(unittest.TestCase):
     def setUp(self):
         self.board = Board()
@@ -64,6 +83,168 @@ class TestBoardActions(unittest.TestCase):
         self.assertEqual(len(self.board_action.get_board()[0]), 8)
 
 
+class TestBoardActionsOnBitBoard(unittest.TestCase):
+    def setUp(self):
+        self.board_action = BoardActions(Board(), None)
+        self.bitboard_action = BoardActions(BitBoard(), None)
+
+    def play(self, moves):
+        computer, user = '2', '1'
+        for index, move in enumerate(moves):
+            player = user if index % 2 == 0 else computer
+            self.board_action.add_move_on_board(move, player)
+            self.bitboard_action.add_move_on_board(move, player)
+
+    def test_same_board(self):
+        self.play([4, 4, 3, 5, 1, 1, 7])
+        self.assertEqual(self.bitboard_action.get_board(), self.board_action.get_board())
+        self.assertEqual(self.bitboard_action.display_board(), self.board_action.display_board())
+
+    def test_verify_move(self):
+        self.play([2] * 6)
+        self.assertEqual(self.bitboard_action.verify_move(2), (False, None, None))
+        self.assertEqual(self.bitboard_action.verify_move(3), self.board_action.verify_move(3))
+
+    def test_is_game_over(self):
+        self.play([1, 1, 2, 2, 3, 3, 4])
+        self.assertEqual(self.bitboard_action.is_game_over(), (True, '1'))
+        self.assertEqual(self.bitboard_action.is_game_over(), self.board_action.is_game_over())
+
+    def test_restart_game(self):
+        empty = '0'
+        board = self.bitboard_action.get_board()
+        self.play([1])
+        self.bitboard_action.restart_game()
+        self.assertIs(self.bitboard_action.get_board(), board)
+        self.assertEqual(board[6][1], empty)
+        board = self.board_action.get_board()
+        self.board_action.restart_game()
+        self.assertIs(self.board_action.get_board(), board)
+        self.assertEqual(board[6][1], empty)
+
+    def test_undo_and_redo(self):
+        computer, user, empty = '2', '1', '0'
+        self.play([4, 4, 3])
+        for board_action in (self.board_action, self.bitboard_action):
+            self.assertEqual(board_action.undo_move(), 3)
+            self.assertEqual(board_action.undo_move(), 4)
+            self.assertEqual(board_action.get_board()[5][4], empty)
+            self.assertEqual(board_action.get_history(), [(4, user)])
+            self.assertEqual(board_action.redo_move(), 4)
+            self.assertEqual(board_action.get_board()[5][4], computer)
+            board_action.add_move_on_board(1, user)
+            with self.assertRaises(BoardException):
+                board_action.redo_move()
+        self.assertEqual(self.bitboard_action.get_board(), self.board_action.get_board())
+        for _ in range(3):
+            self.board_action.undo_move()
+        with self.assertRaises(BoardException):
+            self.board_action.undo_move()
+
+    def test_snapshot_and_restore(self):
+        self.play([4, 4, 3, 5, 1, 1, 7])
+        snapshots = (self.board_action.snapshot(), self.bitboard_action.snapshot())
+        self.assertEqual(snapshots[0], snapshots[1])
+        history = self.board_action.get_history()
+        self.play([2, 2])
+        for board_action, snapshot in zip((self.board_action, self.bitboard_action), snapshots):
+            board = board_action.get_board()
+            board_action.restore(snapshot)
+            self.assertIs(board_action.get_board(), board)
+            self.assertEqual(board_action.get_history(), history)
+            self.assertEqual(board_action.snapshot(), snapshot)
+            # the restored history can be undone like the one played
+            self.assertEqual([board_action.undo_move() for _ in range(7)], [7, 1, 1, 5, 3, 4, 4])
+            self.assertEqual(board_action.snapshot(), BoardActions(Board(), None).snapshot())
+        self.assertEqual(self.bitboard_action.get_board(), self.board_action.get_board())
+
+    def test_restore_pieces_played_elsewhere(self):
+        computer, user = '2', '1'
+        position = BitBoard()
+        for column, player in ((4, user), (4, computer)):
+            position.play(column, player)
+        board_action = BoardActions(BitBoard(), None)
+        board_action.add_move_on_board(3, user)
+        snapshot = board_action.snapshot()
+        board_action.get_position().copy_from(position)
+        self.assertNotEqual(board_action.snapshot(), snapshot)
+        board_action.restore(snapshot)
+        self.assertEqual(board_action.get_position().get_moves(), [3])
+
+
+class TestOtherBoardSizes(unittest.TestCase):
+    sizes = ((7, 8, 4), (7, 9, 5), (5, 5, 3))
+
+    def test_same_rules_on_both_boards(self):
+        user, computer = '1', '2'
+        generator = random.Random(2)
+        for rows, columns, connect in self.sizes:
+            board_action = BoardActions(Board(rows, columns, connect), None)
+            bitboard_action = BoardActions(BitBoard(rows, columns, connect), None)
+            for _ in range(20):
+                board_action.restart_game()
+                bitboard_action.restart_game()
+                player = user
+                while not board_action.is_game_over()[0]:
+                    column = generator.choice(ComputerStrategy(bitboard_action).get_valid_moves())
+                    row = board_action.verify_move(column)[1]
+                    board_action.add_move_on_board(column, player)
+                    bitboard_action.add_move_on_board(column, player)
+                    self.assertEqual(board_action.check_winner(player, (row, column)),
+                                     board_action.check_winner(player))
+                    self.assertEqual(bitboard_action.is_game_over(), board_action.is_game_over())
+                    player = computer if player == user else user
+                self.assertEqual(bitboard_action.get_board(), board_action.get_board())
+
+    def test_verify_move(self):
+        board_action = BoardActions(BitBoard(7, 9, 5), None)
+        self.assertEqual(board_action.verify_move(9), (True, 7, 9))
+        with self.assertRaises(BoardException):
+            board_action.verify_move(10)
+
+    def test_computer_moves(self):
+        user, depth = '1', 4
+        for board in (Board(7, 9, 5), BitBoard(7, 9, 5)):
+            board_action = BoardActions(board, None)
+            computer_strategy = ComputerStrategy(board_action)
+            for difficulty in range(1, 7):
+                self.assertIn(computer_strategy.set_computer_difficulty(difficulty, 0.05), range(1, 10))
+            self.assertIsNone(computer_strategy.solver)
+            for column in (6, 7, 8, 9):
+                board_action.add_move_on_board(column, user)
+            self.assertEqual(computer_strategy.godlike_difficulty_move(depth), 5)
+            self.assertEqual(computer_strategy.hard_difficulty_move(), 5)
+
+    def test_statistics(self):
+        user, depth, columns = '1', 4, 9
+        board_action = BoardActions(BitBoard(7, 9, 5), None)
+        computer_strategy = ComputerStrategy(board_action)
+        computer_strategy.enable_statistics()
+        board_action.add_move_on_board(columns, user)
+        computer_strategy.godlike_difficulty_move(depth)
+        self.assertEqual(len(computer_strategy.last_statistics.cutoffs), columns)
+        self.assertGreater(sum(computer_strategy.last_statistics.cutoffs), 0)
+
+    def test_mirror_symmetric_scores_on_even_width(self):
+        user, computer, depth = '1', '2', 4
+        position = BitBoard(7, 8, 4)
+        for column, player in ((4, user), (5, computer), (4, user), (2, computer), (6, user)):
+            position.play(column, player)
+        board_action = BoardActions(BitBoard(7, 8, 4), None)
+        computer_strategy = ComputerStrategy(board_action, opening_book_path=None, evaluation_cache=None)
+        self.assertEqual(computer_strategy.score_position(position.get_grid(), computer),
+                         computer_strategy.score_position(position.mirrored().get_grid(), computer))
+        # the table shares entries between mirror images, so searching the mirror first changes nothing
+        board_action.get_position().copy_from(position.mirrored())
+        computer_strategy.score_moves(depth)
+        board_action.get_position().copy_from(position)
+        scores = computer_strategy.score_moves(depth)
+        fresh_action = BoardActions(BitBoard(7, 8, 4), None)
+        fresh_action.get_position().copy_from(position)
+        self.assertEqual(scores, ComputerStrategy(fresh_action, opening_book_path=None,
+                                                  evaluation_cache=None).score_moves(depth))
+
+
 class TestComputerStrategy(unittest.TestCase):
     def setUp(self):
         self.board = Board()
@@ -85,12 +266,142 @@ class TestComputerStrategy(unittest.TestCase):
         first_column, last_column = 1, 8
         move = self.computer_strategy.easy_difficulty_move()
         self.assertIn(move, range(first_column, last_column))
+        user, computer = '1', '2'
+        for column in range(first_column, last_column - 1):
+            for row in range(6):
+                self.board_action.add_move_on_board(column, user if (row + column // 3) % 2 else computer)
+        self.assertEqual(self.computer_strategy.easy_difficulty_move(), last_column - 1)
 
     def test_medium_difficulty_move(self):
         first_column, last_column = 1, 8
         move = self.computer_strategy.medium_difficulty_move()
         self.assertIn(move, range(first_column, last_column))
 
+    def test_medium_difficulty_move_next_to_the_edge(self):
+        user, computer = '1', '2'
+        self.board_action.add_move_on_board(6, computer)
+        self.board_action.add_move_on_board(7, user)
+        move = self.computer_strategy.medium_difficulty_move()
+        self.assertIn(move, self.computer_strategy.get_valid_moves())
+
+    def test_minimax_counts_nodes(self):
+        depth = 2
+        computer_strategy = ComputerStrategy(self.board_action, opening_book_path=None)
+        computer_strategy.godlike_difficulty_move(depth)
+        self.assertGreater(computer_strategy.nodes, 7)
+
+    def test_search_statistics(self):
+        user, computer, depth = '1', '2', 4
+        for move, player in ((4, user), (4, computer), (3, user)):
+            self.board_action.add_move_on_board(move, player)
+        computer_strategy = ComputerStrategy(self.board_action, opening_book_path=None)
+        random.seed(3)
+        move = computer_strategy.godlike_difficulty_move(depth)
+        reported = []
+        computer_strategy.enable_statistics(reported.append)
+        computer_strategy.transposition_table.clear()
+        nodes = computer_strategy.nodes
+        random.seed(3)
+        self.assertEqual(computer_strategy.godlike_difficulty_move(depth), move)
+        statistics, = reported
+        self.assertIs(computer_strategy.last_statistics, statistics)
+        self.assertEqual((statistics.column, statistics.source, statistics.depth), (move, 'search', depth))
+        self.assertEqual(statistics.nodes, computer_strategy.nodes - nodes)
+        self.assertGreater(statistics.leaf_evaluations, 0)
+        self.assertGreater(sum(statistics.cutoffs), 0)
+        self.assertEqual(statistics.max_depth, depth)
+        self.assertEqual(sorted(statistics.root_move_times), computer_strategy.get_valid_moves())
+        self.assertEqual(statistics.principal_variation[0], move)
+        self.assertLessEqual(len(statistics.principal_variation), depth)
+
+    def test_search_statistics_disabled(self):
+        depth = 2
+        computer_strategy = ComputerStrategy(self.board_action, opening_book_path=None)
+        computer_strategy.enable_statistics()
+        computer_strategy.disable_statistics()
+        computer_strategy.godlike_difficulty_move(depth)
+        self.assertIsNone(computer_strategy.statistics)
+        self.assertIsNone(computer_strategy.last_statistics)
+
+    def test_search_statistics_of_blocking_move(self):
+        user, depth = '1', 4
+        for column in (1, 2, 3):
+            self.board_action.add_move_on_board(column, user)
+        reported = []
+        self.computer_strategy.enable_statistics(reported.append)
+        self.assertEqual(self.computer_strategy.godlike_difficulty_move(depth), 4)
+        self.assertEqual((reported[0].source, reported[0].nodes), ('block', 0))
+
+    def test_score_moves(self):
+        user, computer, depth = '1', '2', 4
+        for move, player in ((4, user), (4, computer), (3, user), (1, computer), (5, user)):
+            self.board_action.add_move_on_board(move, player)
+        scores = self.computer_strategy.score_moves(depth)
+        self.assertEqual(sorted(scores), self.computer_strategy.get_valid_moves())
+        # leaving the open three alone loses at once
+        self.assertEqual(scores[1], -10000000000000)
+        position = BitBoard.from_grid(self.board_action.get_board())
+        self.assertEqual(self.computer_strategy._search_root(position, position.get_valid_moves(), depth),
+                         max(((column, score) for column, score in scores.items()),
+                             key=lambda entry: (entry[1], -entry[0])))
+
+    def test_move_ordering_keeps_scores(self):
+        user, computer, depth = '1', '2', 5
+
+        def search(move_ordering):
+            # the scores of a few positions and the nodes searched for them
+            position = BitBoard()
+            computer_strategy = ComputerStrategy(BoardActions(position, None), opening_book_path=None)
+            computer_strategy.move_ordering = move_ordering
+            scores = []
+            for moves in ('734337', '34435274', '462321', '5762212517557561'):
+                position.reset_board()
+                for ply, column in enumerate(moves):
+                    position.play(int(column), user if ply % 2 == 0 else computer)
+                scores.append(computer_strategy.score_moves(depth))
+            return scores, computer_strategy.nodes
+
+        plain_scores, plain_nodes = search(False)
+        ordered_scores, ordered_nodes = search(True)
+        self.assertEqual(ordered_scores, plain_scores)
+        self.assertLess(ordered_nodes, plain_nodes)
+
+    def test_depth_beyond_board_size(self):
+        user, computer, pieces = '1', '2', 30
+        position = BitBoard()
+        computer_strategy = ComputerStrategy(BoardActions(position, None), opening_book_path=None)
+        generator = random.Random(9)
+        while len(position.get_moves()) < pieces:
+            position.play(generator.choice(position.get_valid_moves()), user if len(position.get_moves()) % 2 == 0
+                          else computer)
+            if position.last_move_result()[0]:
+                position.reset_board()
+        depth = position.geometry.rows * position.geometry.columns + 2
+        scores = computer_strategy.score_moves(depth)
+        computer_strategy.move_ordering = False
+        computer_strategy.transposition_table.clear()
+        self.assertEqual(computer_strategy.score_moves(depth), scores)
+
+    def test_minimax_stops_at_immediate_win(self):
+        computer, depth = '2', 4
+        position = BitBoard()
+        computer_strategy = ComputerStrategy(BoardActions(position, None), opening_book_path=None)
+        for column in (1, 2, 3):
+            position.play(column, computer)
+        self.assertEqual(computer_strategy.minimax(position, depth, -math.inf, math.inf, True), 100000000000000)
+        self.assertEqual(computer_strategy.nodes, 1)
+
+    def test_cancel(self):
+        depth, time_budget = 8, 10
+        computer_strategy = ComputerStrategy(self.board_action, opening_book_path=None)
+        computer_strategy.enable_statistics()
+        computer_strategy.cancel()
+        with self.assertRaises(SearchCancelled):
+            computer_strategy.godlike_difficulty_move(depth, time_budget)
+        self.assertIsNone(computer_strategy.statistics)
+        computer_strategy.cancelled = False
+        self.assertIn(computer_strategy.godlike_difficulty_move(2), computer_strategy.get_valid_moves())
+
     def test_hard_difficulty_move(self):
         first_column, last_column = 1, 8
         move = self.computer_strategy.hard_difficulty_move()
@@ -107,68 +418,305 @@ class TestComputerStrategy(unittest.TestCase):
         move = self.computer_strategy.godlike_difficulty_move(easy)
         self.assertIn(move, range(first_column, last_column))
 
+    def test_godlike_difficulty_move_leaves_board_unchanged(self):
+        user, computer, depth = '1', '2', 4
+        for move, player in ((4, user), (4, computer), (3, user)):
+            self.board_action.add_move_on_board(move, player)
+        board = [list(row) for row in self.board_action.get_board()]
+        self.computer_strategy.godlike_difficulty_move(depth)
+        self.assertEqual(self.board_action.get_board(), board)
+
+    def test_minimax_detects_win_in_searched_node(self):
+        user, computer, depth = '1', '2', 2
+        position = BitBoard()
+        for column in range(1, 4):
+            position.play(column, computer)
+            position.play(column, user)
+        position.play(4, computer)
+        self.assertEqual(self.computer_strategy.minimax(position, depth, -math.inf, math.inf, False),
+                         100000000000000)
+
+    def test_godlike_difficulty_move_same_with_transposition_table(self):
+        user, computer, depth = '1', '2', 4
+        for move, player in ((4, user), (5, computer), (4, user), (3, computer), (2, user)):
+            self.board_action.add_move_on_board(move, player)
+        small_table_strategy = ComputerStrategy(self.board_action, transposition_table_size=1)
+        random.seed(1)
+        move = self.computer_strategy.godlike_difficulty_move(depth)
+        random.seed(1)
+        self.assertEqual(small_table_strategy.godlike_difficulty_move(depth), move)
+        self.assertGreater(self.computer_strategy.transposition_table.hits, 0)
+
+    def test_godlike_difficulty_move_with_time_budget(self):
+        user, computer, maximum_depth, time_budget = '1', '2', 42, 0.05
+        for move, player in ((4, user), (5, computer), (4, user)):
+            self.board_action.add_move_on_board(move, player)
+        board = [list(row) for row in self.board_action.get_board()]
+        start = time.perf_counter()
+        move = self.computer_strategy.godlike_difficulty_move(maximum_depth, time_budget)
+        self.assertLess(time.perf_counter() - start, time_budget + 0.1)
+        self.assertIn(move, self.computer_strategy.get_valid_moves())
+        self.assertEqual(self.board_action.get_board(), board)
+
+    def test_timed_out_search_leaves_position_unchanged(self):
+        user, computer, depth = '1', '2', 42
+        for move, player in ((4, user), (5, computer), (4, user)):
+            self.board_action.add_move_on_board(move, player)
+        position = BitBoard.from_grid(self.board_action.get_board())
+        pieces, moves = position.get_pieces(computer), position.get_moves()
+        self.computer_strategy._deadline = time.perf_counter() + 0.02
+        with self.assertRaises(SearchTimeout):
+            self.computer_strategy.minimax(position, depth, -math.inf, math.inf, True)
+        self.computer_strategy._deadline = None
+        self.assertEqual((position.get_pieces(computer), position.get_moves()), (pieces, moves))
+        # so the principal variation read after a timeout starts from the searched position
+        self.computer_strategy.enable_statistics()
+        self.computer_strategy.godlike_difficulty_move(depth, 0.05)
+        variation = self.computer_strategy.last_statistics.principal_variation
+        for ply, column in enumerate(variation):
+            self.assertIn(column, position.get_valid_moves())
+            position.play(column, computer if ply % 2 == 0 else user)
+
+    def test_godlike_difficulty_move_time_budget_finds_win(self):
+        user, computer, maximum_depth, time_budget = '1', '2', 42, 0.05
+        for move, player in ((1, user), (2, computer), (1, user), (2, computer), (7, user), (2, computer),
+                             (7, user)):
+            self.board_action.add_move_on_board(move, player)
+        self.assertEqual(self.computer_strategy.godlike_difficulty_move(maximum_depth, time_budget), 2)
+
+    def test_perfect_difficulty_move(self):
+        user, computer = '1', '2'
+        best_move = 6
+        for index, move in enumerate([int(column) for column in '2252576253462244111563365343671351441']):
+            self.board_action.add_move_on_board(move, user if index % 2 == 0 else computer)
+        self.assertEqual(self.computer_strategy.perfect_difficulty_move(), best_move)
+
+    def test_perfect_difficulty_move_falls_back_to_search(self):
+        first_column, last_column, time_budget = 1, 8, 0.05
+        move = self.computer_strategy.perfect_difficulty_move(time_budget)
+        self.assertIn(move, range(first_column, last_column))
+
+    def test_evaluation_cache(self):
+        user, medium = '1', 2
+        cache = EvaluationCache()
+        computer_strategy = ComputerStrategy(self.board_action, evaluation_cache=cache)
+        uncached_strategy = ComputerStrategy(self.board_action, evaluation_cache=None)
+        for column in (1, 2, 3):
+            self.board_action.add_move_on_board(column, user)
+        for _ in range(2):
+            self.assertEqual(computer_strategy.hard_difficulty_move(), 4)
+        self.assertEqual(cache.get_statistics()['hits'], 1)
+        # random picks are drawn again on every move, from the cached columns
+        self.board_action.restart_game()
+        for seed in range(3):
+            random.seed(seed)
+            move = computer_strategy.medium_difficulty_move()
+            random.seed(seed)
+            self.assertEqual(uncached_strategy.medium_difficulty_move(), move)
+        self.assertEqual(cache.get((medium, 6, 7, 4, 0, 0)), ([1, 2, 3, 4, 5, 6, 7], True))
+
+    def test_monte_carlo_difficulty_move(self):
+        user, computer, time_budget = '1', '2', 0.05
+        for column in (4, 4, 4):
+            self.board_action.add_move_on_board(column, user)
+        self.assertEqual(self.computer_strategy.monte_carlo_difficulty_move(time_budget), 4)
+        self.board_action.restart_game()
+        self.board_action.add_move_on_board(4, user)
+        column = self.computer_strategy.set_computer_difficulty(6, time_budget)
+        self.assertIn(column, range(1, 8))
+        self.board_action.add_move_on_board(column, computer)
+        self.board_action.add_move_on_board(3, user)
+        self.computer_strategy.monte_carlo_difficulty_move(time_budget)
+        # the second move starts from the part of the first tree under the two moves played
+        self.assertGreater(self.computer_strategy.mcts.reused, 1)
+        self.computer_strategy.cancel()
+        with self.assertRaises(SearchCancelled):
+            self.computer_strategy.monte_carlo_difficulty_move(time_budget)
+
+    def test_opening_book_move(self):
+        user, book_column = '1', 3
+        path = os.path.join(tempfile.mkdtemp(), 'book.bin')
+        self.board_action.add_move_on_board(3, user)
+        position = BitBoard.from_grid(self.board_action.get_board())
+        key = canonical_key(position.get_pieces('2'), position.get_mask())[0]
+        write_opening_book(path, {key: (0, book_column)})
+        strategy = ComputerStrategy(self.board_action, opening_book_path=path)
+        self.assertEqual(strategy.opening_book_move(position), book_column)
+        self.assertEqual(strategy.godlike_difficulty_move(4), book_column)
+        self.assertEqual(strategy.perfect_difficulty_move(), book_column)
+
+    def test_transposition_table_shared_by_mirrored_positions(self):
+        user, depth = '1', 3
+        position = BitBoard()
+        position.play(2, user)
+        mirrored_position = position.mirrored()
+        self.computer_strategy.minimax(position, depth, -math.inf, math.inf, True)
+        used = self.computer_strategy.transposition_table.get_statistics()['used']
+        hits = self.computer_strategy.transposition_table.hits
+        self.computer_strategy.minimax(mirrored_position, depth, -math.inf, math.inf, True)
+        self.assertEqual(self.computer_strategy.transposition_table.get_statistics()['used'], used)
+        self.assertEqual(self.computer_strategy.transposition_table.hits, hits + 1)
+
+    def test_transposition_table_keeps_player_to_move_apart(self):
+        user, computer, depth = '1', '2', 4
+        for move, player in ((5, user), (5, computer), (2, user)):
+            self.board_action.add_move_on_board(move, player)
+        self.computer_strategy.score_moves(depth + 1)
+        # the computer moves again, so the search sees the pieces of the last one with the other player to move
+        self.board_action.add_move_on_board(3, computer)
+        fresh_strategy = ComputerStrategy(self.board_action, opening_book_path=None, evaluation_cache=None)
+        self.assertEqual(self.computer_strategy.score_moves(depth), fresh_strategy.score_moves(depth))
+
+    def test_score_position(self):
+        computer, center_column, center_weight = '2', 4, 3
+        board = self.board_action.get_board()
+        board[6][center_column] = computer
+        self.assertEqual(self.computer_strategy.score_position(board, computer), center_weight)
+
 
 class BoardActions:
     def __init__(self, board, computer_strategy):
+        self._container = board
+        self._bitboard = board if isinstance(board, BitBoard) else None
+        self.geometry = board.geometry
         self._board = board.reset_board()
         self.computer_strategy = computer_strategy
+        # (row, column, player) of every move played through add_move_on_board, and the moves undone since
+        self._history = []
+        self._redo = []
+        # a BitBoard of the same size only used for its cell masks when the game is played on a Board
+        self._layout = self._bitboard if self._bitboard is not None else \
+            BitBoard(self.geometry.rows, self.geometry.columns, self.geometry.connect)
 
     def add_move_on_board(self, move, type_finder):
+        self._play(move, type_finder)
+        self._redo.clear()
+
+    def _play(self, move, type_finder):
         user, computer = '1', '2'
         move_available, row, column = self.verify_move(move)
-        if move_available and type_finder == user:
+        if move_available and self._bitboard is not None and type_finder in (user, computer):
+            self._bitboard.play(column, type_finder)
+        elif move_available and type_finder == user:
             self._board[row][column] = user
         elif move_available and type_finder == computer:
             self._board[row][column] = computer
         elif not move_available:
             raise BoardException("You can't move here")
-
-    def computer_move(self, computer_difficulty):
-        computer_move = self.computer_strategy.set_computer_difficulty(computer_difficulty)
+        if type_finder in (user, computer):
+            self._history.append((row, column, type_finder))
+
+    def undo_move(self):
+        empty = '0'
+        if not self._history:
+            raise BoardException("No move to undo")
+        row, column, player = self._history.pop()
+        if self._bitboard is not None:
+            self._bitboard.undo()
+        else:
+            self._board[row][column] = empty
+        self._redo.append((column, player))
+        return column
+
+    def redo_move(self):
+        if not self._redo:
+            raise BoardException("No move to redo")
+        column, player = self._redo.pop()
+        self._play(column, player)
+        return column
+
+    def get_history(self):
+        return [(column, player) for _, column, player in self._history]
+
+    def snapshot(self):
+        # the pieces of both players and the move history packed in one int: the user's pieces, then the
+        # computer's, each as a BitBoard mask, then five bits per move above a leading one
+        user, computer = '1', '2'
+        if self._bitboard is not None:
+            user_pieces, computer_pieces = self._bitboard.get_pieces(user), self._bitboard.get_pieces(computer)
+        else:
+            user_pieces = computer_pieces = 0
+            for row in range(1, self.geometry.rows + 1):
+                for column in range(1, self.geometry.columns + 1):
+                    cell = self._board[row][column]
+                    if cell == user:
+                        user_pieces |= self._layout.cell_mask(row, column)
+                    elif cell == computer:
+                        computer_pieces |= self._layout.cell_mask(row, column)
+        history = 1
+        for _, column, player in self._history:
+            history = history << 5 | column << 1 | (player == computer)
+        board_bits = self.geometry.columns * (self.geometry.rows + 1)
+        return (history << board_bits | computer_pieces) << board_bits | user_pieces
+
+    def restore(self, snapshot):
+        # loads a snapshot of a board of the same size in place; the moves undone before are forgotten
+        user, computer = '1', '2'
+        board_bits = self.geometry.columns * (self.geometry.rows + 1)
+        board_mask = (1 << board_bits) - 1
+        user_pieces, computer_pieces = snapshot & board_mask, snapshot >> board_bits & board_mask
+        history = snapshot >> 2 * board_bits
+        moves = []
+        while history > 1:
+            moves.append((history >> 1 & 15, computer if history & 1 else user))
+            history >>= 5
+        moves.reverse()
+        if self._bitboard is not None:
+            self._bitboard.load(user_pieces, computer_pieces, moves)
+        else:
+            self._container.reset_board()
+            for player, pieces in ((user, user_pieces), (computer, computer_pieces)):
+                for row, column in self._layout.cells_of(pieces):
+                    self._board[row][column] = player
+        # the moves of the history are the top pieces of their columns, the last one played highest
+        self._history.clear()
+        pieces_above = {}
+        for column, player in reversed(moves):
+            move_available, row, _ = self.verify_move(column)
+            top_row = row + 1 if move_available else 1
+            self._history.append((top_row + pieces_above.get(column, 0), column, player))
+            pieces_above[column] = pieces_above.get(column, 0) + 1
+        self._history.reverse()
+        self._redo.clear()
+
+    def computer_move(self, computer_difficulty, time_budget=None):
+        computer_move = self.computer_strategy.set_computer_difficulty(computer_difficulty, time_budget)
         self.add_move_on_board(computer_move, '2')
 
     def verify_move(self, move):
-        rows = 6
-        if move < 1 or move > 8:
+        rows, columns = self.geometry.rows, self.geometry.columns
+        if move < 1 or move > columns:
             raise BoardException("You can't move here")
+        if self._bitboard is not None:
+            row = self._bitboard.next_open_row(move)
+            if row is None:
+                return False, None, None
+            return True, row, move
         for row in range(rows, 0, -1):
             if self._board[row][move] == '0':
                 return True, row, move
         return False, None, None
 
-    def check_winner(self, player):
-        rows, columns, piece_alignment = 6, 7, 4
-        # horizontal check
-        for row in range(1, rows + 1):
-            for column in range(1, columns - 2):
-                if all(self._board[row][column + i] == player for i in range(piece_alignment)):
-                    return True
-
-        # vertical check
-        for row in range(1, rows - 2):
-            for column in range(1, columns + 1):
-                if all(self._board[row + i][column] == player for i in range(piece_alignment)):
-                    return True
-
-        # upward diagonal check
-        for row in range(1, rows - 2):
-            for column in range(1, columns - 2):
-                if all(self._board[row + i][column + i] == player for i in range(piece_alignment)):
-                    return True
-
-        # downwards diagonal check
-        for row in range(piece_alignment, rows + 1):
-            for column in range(1, columns - 2):
-                if all(self._board[row - i][column + i] == player for i in range(piece_alignment)):
-                    return True
+    def check_winner(self, player, cell=None):
+        # with the (row, column) of the piece just dropped only the lines through it are looked at
+        if self._bitboard is not None:
+            return self._bitboard.is_winner(player)
+        lines = self.geometry.lines if cell is None else self.geometry.lines_through_cell[cell]
+        board = self._board
+        for line in lines:
+            if all(board[row][column] == player for row, column in line):
+                return True
         return False
 
     def is_game_over(self):
-        user, computer, empty, rows, columns = '1', '2', '0', 7, 8
+        user, computer, empty = '1', '2', '0'
+        rows, columns = self.geometry.rows + 1, self.geometry.columns + 1
         if self.check_winner(user):
             return True, user
         elif self.check_winner(computer):
             return True, computer
+        if self._bitboard is not None:
+            return (True, None) if self._bitboard.is_full() else (False, None)
         for row in range(1, rows):
             for column in range(1, columns):
                 if self._board[row][column] == empty:
@@ -176,26 +724,114 @@ class BoardActions:
         return True, None
 
     def restart_game(self):
-        board = Board()
-        self._board = board.reset_board()
+        # the board is emptied in place, so the grid handed out before stays the game's board
+        self._board = self._container.reset_board()
+        self._history.clear()
+        self._redo.clear()
         return self._board
 
     def display_board(self):
-        board = texttable.Texttable()
-        board.add_rows(self._board)
-        return board.draw()
+        # imported here, so processes that never draw a board don't load the renderer
+        from src.repository.board_renderer import render_board
+        return render_board(self._board)
 
     def get_board(self):
         return self._board
 
+    def get_position(self):
+        # the BitBoard of the game, or one read from the grid in one pass when the game is played on a Board
+        if self._bitboard is not None:
+            return self._bitboard
+        return BitBoard.from_grid(self._board, self.geometry.connect)
+
 
 class ComputerStrategy:
-    def __init__(self, board_action):
+    def __init__(self, board_action, transposition_table_size=2 ** 16, opening_book_path=DEFAULT_BOOK_PATH,
+                 parallel_search=None, evaluation_cache=EVALUATION_CACHE):
         self.board_action = board_action
+        self.geometry = board_action.geometry
         self._board = board_action.get_board()
-
-    def set_computer_difficulty(self, difficulty):
-        easy_level, medium_level, hard_level, godlike_level, maximum_depth_of_analysis = 1, 2, 3, 4, 2
+        self.transposition_table = TranspositionTable(transposition_table_size)
+        self.opening_book_path = opening_book_path
+        self.opening_book = None
+        self.solver = None
+        self.mcts = None
+        self.parallel_search = parallel_search
+        # shared by the strategies of the process for the Medium and Hard levels, None to always work moves out
+        self.evaluation_cache = evaluation_cache
+        self.nodes = 0
+        self.statistics = None
+        self.last_statistics = None
+        self.statistics_callback = None
+        self._collect_statistics = False
+        self._statistics_start = None
+        self._deadline = None
+        self.cancelled = False
+        self.move_ordering = True
+        # where the random moves are drawn from, the module-level generator unless a caller gives its own
+        self.random = random
+        # columns from the centre outwards, the left one first on equal distance
+        self._centre_rank = [0] * (self.geometry.columns + 1)
+        for rank, column in enumerate(sorted(range(1, self.geometry.columns + 1),
+                                             key=lambda column: (abs(column - self.geometry.center_column), column))):
+            self._centre_rank[column] = rank
+        self._killers = []
+        self._history = {}
+        self.new_search()
+
+    def new_search(self):
+        # a new move: old transposition table entries get replaced first and the move ordering starts over
+        self.transposition_table.new_search()
+        self._killers = [[] for _ in range(self.geometry.rows * self.geometry.columns + 1)]
+        self._history = {player: [0] * (self.geometry.columns + 1) for player in ('1', '2')}
+
+    def cancel(self):
+        # called from another thread: the search running now stops at its next node with SearchCancelled,
+        # and so does every search until cancelled is set back to False
+        self.cancelled = True
+
+    def enable_statistics(self, callback=None):
+        # every following Godlike, Perfect and Monte Carlo move fills a SearchStatistics and passes it to the callback
+        self._collect_statistics = True
+        self.statistics_callback = callback
+
+    def disable_statistics(self):
+        self._collect_statistics = False
+        self.statistics_callback = None
+        self.statistics = None
+
+    def _start_statistics(self):
+        if not self._collect_statistics:
+            return None
+        if self.statistics is not None:
+            # a Perfect move falling back to the Godlike search keeps filling its own statistics
+            return self.statistics
+        self.statistics = SearchStatistics(self.geometry.columns)
+        self._statistics_start = (time.perf_counter(), self.nodes, self.transposition_table.hits,
+                                  self.solver.nodes if self.solver is not None else 0)
+        return self.statistics
+
+    def _finish_statistics(self, column, source, position=None):
+        statistics = self.statistics
+        if statistics is None:
+            return column
+        start, nodes, cache_hits, solver_nodes = self._statistics_start
+        statistics.column, statistics.source = column, source
+        statistics.elapsed = time.perf_counter() - start
+        statistics.nodes = self.nodes - nodes + (self.solver.nodes - solver_nodes if self.solver is not None else 0)
+        statistics.cache_hits = self.transposition_table.hits - cache_hits
+        if position is not None:
+            statistics.principal_variation = self.principal_variation(position, column, statistics.depth)
+        self.statistics, self.last_statistics = None, statistics
+        if self.statistics_callback is not None:
+            self.statistics_callback(statistics)
+        return column
+
+    def set_computer_difficulty(self, difficulty, time_budget=None):
+        easy_level, medium_level, hard_level, godlike_level, perfect_level, monte_carlo_level = 1, 2, 3, 4, 5, 6
+        maximum_depth_of_analysis = 4
+        if time_budget is not None:
+            maximum_depth_of_analysis = self.geometry.rows * self.geometry.columns
         if difficulty == easy_level:
             return self.easy_difficulty_move()
         elif difficulty == medium_level:
@@ -203,61 +839,79 @@ class ComputerStrategy:
         elif difficulty == hard_level:
             return self.hard_difficulty_move()
         elif difficulty == godlike_level:
-            return self.godlike_difficulty_move(maximum_depth_of_analysis)
+            return self.godlike_difficulty_move(maximum_depth_of_analysis, time_budget)
+        elif difficulty == perfect_level:
+            return self.perfect_difficulty_move(time_budget)
+        elif difficulty == monte_carlo_level:
+            return self.monte_carlo_difficulty_move(time_budget)
 
     def easy_difficulty_move(self):
-        while True:
-            computer_move = random.randint(1, 7)
-            move_available, row, column = self.board_action.verify_move(computer_move)
-            if move_available:
-                return computer_move
+        # one draw among the open columns, instead of drawing again until an open one comes up
+        return self.random.choice(self.get_valid_moves())
 
     def medium_difficulty_move(self):
-        user, computer, empty, columns, rows = '1', '2', '0', 7, 6
+        medium_level = 2
+        return self._cached_move(medium_level, self._medium_candidates)
+
+    def _medium_candidates(self, position):
+        user, empty = '1', '0'
+        columns, rows = self.geometry.columns, self.geometry.rows
         for row in (rows, 0, -1):
             for column in (columns, 0, -1):
                 if self._board[row][column] == user:
                     if self._board[row][column - 1] == empty and self.board_action.verify_move(column - 1)[
                         0] == True and row == self.board_action.verify_move(column - 1)[1]:
                         computer_move = column - 1
-                        return computer_move
-                    elif self._board[row][column + 1] == empty and self.board_action.verify_move(column + 1)[
-                        0] == True and row == self.board_action.verify_move(column + 1)[1]:
+                        return [computer_move], False
+                    elif column + 1 <= columns and self._board[row][column + 1] == empty and \
+                            self.board_action.verify_move(column + 1)[0] == True and \
+                            row == self.board_action.verify_move(column + 1)[1]:
                         computer_move = column + 1
-                        return computer_move
-                    elif self._board[row + 1][column] == empty and self.board_action.verify_move(column)[
-                        0] == True and row + 1 == self.board_action.verify_move(column)[1]:
+                        return [computer_move], False
+                    elif row + 1 <= rows and self._board[row + 1][column] == empty and \
+                            self.board_action.verify_move(column)[0] == True and \
+                            row + 1 == self.board_action.verify_move(column)[1]:
                         computer_move = column
-                        return computer_move
-        computer_move = random.choice(self.get_valid_moves())
-        return computer_move
+                        return [computer_move], False
+        return self.get_valid_moves(), True
 
     def hard_difficulty_move(self):
-        user, computer, empty, columns = '1', '2', '0', 7
-        for column in range(columns, 0, -1):
-            move_available, row, column = self.board_action.verify_move(column)
-            if move_available:
-                self._board[row][column] = user
-                if not self.board_action.check_winner(user):
-                    self._board[row][column] = empty
-                    if self.block_player_win() is None:
-                        if self.try_to_win() is not None:
-                            computer_move = self.try_to_win()
-                            return computer_move
-                        elif self.try_to_win() is None:
-                            computer_move = random.choice(self.get_valid_moves())
-                            return computer_move
-                    elif self.block_player_win() is not None:
-                        computer_move = self.block_player_win()
-                        return computer_move
-                elif self.board_action.check_winner(user):
-                    self._board[row][column] = empty
-                    computer_move = column
-                    return computer_move
+        hard_level = 3
+        return self._cached_move(hard_level, self._hard_candidates)
+
+    def _hard_candidates(self, position):
+        user, computer = '1', '2'
+        threats = ThreatAnalysis(position)
+        blocks = threats.winning_moves(user)
+        if blocks:
+            # the rightmost open column is looked at first
+            valid_moves = self.get_valid_moves()
+            return [valid_moves[-1] if valid_moves[-1] in blocks else blocks[0]], False
+        wins = threats.winning_moves(computer)
+        if wins:
+            return [wins[0]], False
+        return self.get_valid_moves(), True
+
+    def _cached_move(self, difficulty, find_candidates):
+        # the columns a level chooses from depend on the position only, so they are cached; a random
+        # pick among them is still drawn on every move
+        user, computer = '1', '2'
+        position = self.board_action.get_position()
+        cache, key, entry = self.evaluation_cache, None, None
+        if cache is not None:
+            key = (difficulty, self.geometry.rows, self.geometry.columns, self.geometry.connect,
+                   position.get_pieces(user), position.get_pieces(computer))
+            entry = cache.get(key)
+        if entry is None:
+            entry = find_candidates(position)
+            if cache is not None:
+                cache.put(key, *entry)
+        candidates, random_pick = entry
+        return self.random.choice(candidates) if random_pick else candidates[0]
 
     def get_valid_moves(self):
         valid_moves = []
-        columns, rows, empty = 8, 6, '0'
+        columns, rows, empty = self.geometry.columns + 1, self.geometry.rows, '0'
         for column in range(1, columns):
             for row in range(rows, 0, -1):
                 if self._board[row][column] == empty:
@@ -265,58 +919,188 @@ class ComputerStrategy:
                     break
         return valid_moves
 
+    def threat_analysis(self):
+        return ThreatAnalysis(self.board_action.get_position())
+
     def block_player_win(self):
-        user, empty = '1', '0'
-        for move in self.get_valid_moves():
-            move_available, row, column = self.board_action.verify_move(move)
-            if move_available:
-                self._board[row][column] = user
-                if self.board_action.check_winner(user):
-                    self._board[row][column] = empty
-                    return move
-                self._board[row][column] = empty
-        return None
+        user = '1'
+        blocks = self.threat_analysis().winning_moves(user)
+        return blocks[0] if blocks else None
 
     def try_to_win(self):
-        computer, empty = '2', '0'
-        for move in self.get_valid_moves():
-            move_available, row, column = self.board_action.verify_move(move)
-            if move_available:
-                self._board[row][column] = computer
-                if self.board_action.check_winner(computer):
-                    self._board[row][column] = empty
-                    return move
-                self._board[row][column] = empty
-        return None
-
-    def godlike_difficulty_move(self, depth):
+        computer = '2'
+        wins = self.threat_analysis().winning_moves(computer)
+        return wins[0] if wins else None
+
+    def godlike_difficulty_move(self, depth, time_budget=None):
+        user, computer = '1', '2'
+        statistics = self._start_statistics()
         valid_locations = self.get_valid_moves()
+        best_column = self.random.choice(valid_locations)
+
+        threats = self.threat_analysis()
+        blocks = threats.winning_moves(user)
+        if blocks:
+            return self._finish_statistics(blocks[0], 'block')
+        wins = threats.winning_moves(computer)
+        if wins:
+            return self._finish_statistics(wins[0], 'win')
+
+        position = BitBoard.from_grid(self._board, self.geometry.connect)
+        opening_move = self.opening_book_move(position)
+        if opening_move is not None:
+            return self._finish_statistics(opening_move, 'book')
+
+        self.new_search()
+        if time_budget is None:
+            best_column = self._search_root(position, valid_locations, depth)[0]
+            if statistics is not None:
+                statistics.depth = depth
+            return self._finish_statistics(best_column, 'search', position)
+
+        # iterative deepening: keep the move of the deepest iteration finished before the deadline
+        win_score, empty = 100000000000000, '0'
+        empty_cells = sum(row[1:].count(empty) for row in self._board[1:])
+        deadline = time.perf_counter() + time_budget
+        for current_depth in range(1, min(depth, empty_cells) + 1):
+            ordered_locations = [best_column] + [column for column in valid_locations if column != best_column]
+            self._deadline = deadline if current_depth > 1 else None
+            try:
+                best_column, best_score = self._search_root(position, ordered_locations, current_depth)
+            except SearchTimeout:
+                break
+            finally:
+                self._deadline = None
+            if statistics is not None:
+                statistics.depth = current_depth
+            if best_score >= win_score or time.perf_counter() >= deadline:
+                break
+        return self._finish_statistics(best_column, 'search', position)
+
+    def _search_root(self, position, valid_locations, depth):
+        statistics = self.statistics
+        if statistics is not None:
+            statistics.search_depth = depth
+        if self.parallel_search is not None:
+            return self.parallel_search.search(position, valid_locations, depth, self._deadline)
         best_score = -math.inf
-        best_column = random.choice(valid_locations)
-
-        if self.block_player_win() is not None:
-            computer_move = self.block_player_win()
-            return computer_move
-        if self.try_to_win() is not None:
-            computer_move = self.try_to_win()
-            return computer_move
-
+        best_column = valid_locations[0]
+        try:
+            for column, score in self._score_root_moves(position, valid_locations, depth):
+                # equal scores go to the leftmost column whatever order the columns were searched in
+                if score > best_score or (score == best_score and column < best_column):
+                    best_score = score
+                    best_column = column
+        except SearchCancelled:
+            # nothing of a cancelled search is reported
+            self.statistics = None
+            raise
+
+        return best_column, best_score
+
+    def _score_root_moves(self, position, valid_locations, depth):
         computer = '2'
+        statistics = self.statistics
+        evaluator = WindowEvaluator(computer, position.geometry)
+        evaluator.load(position.get_grid())
+        threats = ThreatAnalysis(position)
         for column in valid_locations:
-            row = self.get_next_open_row(self._board, column)
-            temp_board = copy.deepcopy(self._board)
-            temp_board[row][column] = computer
-            score = self.minimax(temp_board, depth - 1, -math.inf, math.inf, False)
-
-            if score > best_score:
-                best_score = score
-                best_column = column
-
-        return best_column
-
-    def minimax(self, board, depth, alpha, beta, maximizing_player):
+            start = time.perf_counter() if statistics is not None else None
+            row = threats.play(column, computer)
+            evaluator.play(row, column, computer)
+            try:
+                score = self.minimax(position, depth - 1, -math.inf, math.inf, False, evaluator, threats)
+            finally:
+                threats.undo()
+                evaluator.undo(row, column, computer)
+            if statistics is not None:
+                statistics.root_move_times[column] = statistics.root_move_times.get(column, 0.0) + \
+                                                     time.perf_counter() - start
+            yield column, score
+
+    def score_moves(self, depth):
+        # the Godlike search score of every valid move of the computer, for analysis tools
+        position = BitBoard.from_grid(self._board, self.geometry.connect)
+        self.new_search()
+        return dict(self._score_root_moves(position, position.get_valid_moves(), depth))
+
+    def perfect_difficulty_move(self, time_budget=None):
+        computer, default_time_of_analysis = '2', 1
+        rows, columns = self.geometry.rows, self.geometry.columns
+        if time_budget is None:
+            time_budget = default_time_of_analysis
+        if self.geometry != STANDARD_GEOMETRY:
+            # the solver and the opening book only know the 7x6 connect-4 board
+            return self.godlike_difficulty_move(rows * columns, time_budget)
+        if self.solver is None:
+            self.solver = Solver()
+        self._start_statistics()
+        position = BitBoard.from_grid(self._board, self.geometry.connect)
+        opening_move = self.opening_book_move(position)
+        if opening_move is not None:
+            return self._finish_statistics(opening_move, 'book')
+
+        mask = position.get_mask()
+        try:
+            computer_move = self.solver.best_move(position.get_pieces(computer), mask, mask.bit_count(),
+                                                  time_budget / 2)[0]
+            return self._finish_statistics(computer_move, 'solver')
+        except SolverTimeout:
+            # positions too early for the book and the solver get the best heuristic move instead
+            return self.godlike_difficulty_move(rows * columns, time_budget / 2)
+
+    def monte_carlo_difficulty_move(self, time_budget=None):
+        user, computer, default_time_of_analysis = '1', '2', 1
+        if time_budget is None:
+            time_budget = default_time_of_analysis
+        self._start_statistics()
+        threats = self.threat_analysis()
+        wins = threats.winning_moves(computer)
+        if wins:
+            return self._finish_statistics(wins[0], 'win')
+        blocks = threats.winning_moves(user)
+        if blocks:
+            return self._finish_statistics(blocks[0], 'block')
+
+        if self.mcts is None:
+            self.mcts = MonteCarloTreeSearch(self.geometry)
+        self.mcts.generator = self.random
+        position = BitBoard.from_grid(self._board, self.geometry.connect)
+        computer_move = self.mcts.best_move(position, computer, time_budget, stop=lambda: self.cancelled)
+        if self.cancelled:
+            self.statistics = None
+            raise SearchCancelled()
+        self.nodes += self.mcts.iterations
+        return self._finish_statistics(computer_move, 'mcts')
+
+    def opening_book_move(self, position):
+        computer = '2'
+        if position.geometry != STANDARD_GEOMETRY:
+            return None
+        if self.opening_book is None and self.opening_book_path is not None \
+                and os.path.exists(self.opening_book_path):
+            self.opening_book = OpeningBook.open(self.opening_book_path)
+        if self.opening_book is None:
+            return None
+        entry = book_move(self.opening_book, position.get_pieces(computer), position.get_mask())
+        return entry[0] if entry is not None else None
+
+    def minimax(self, position, depth, alpha, beta, maximizing_player, evaluator=None, threats=None):
         user, computer = '1', '2'
-        game_status, winner = self.board_action.is_game_over()
+        self.nodes += 1
+        statistics = self.statistics
+        if statistics is not None and statistics.search_depth - depth > statistics.max_depth:
+            statistics.max_depth = statistics.search_depth - depth
+        if evaluator is None:
+            evaluator = WindowEvaluator(computer, position.geometry)
+            evaluator.load(position.get_grid())
+        if threats is None:
+            threats = ThreatAnalysis(position)
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+        if self.cancelled:
+            raise SearchCancelled()
+        game_status, winner = position.last_move_result()
 
         if depth == 0 or game_status:
             if game_status:
@@ -327,34 +1111,142 @@ class ComputerStrategy:
                 else:
                     return 0
             else:
-                return self.score_position(board, computer)
-
-        valid_locations = self.get_valid_moves()
+                if statistics is not None:
+                    statistics.leaf_evaluations += 1
+                return evaluator.get_score()
+
+        # the window before the table narrows it decides which bound a result is, as a value outside a
+        # narrowed window is no bound of the true value
+        original_alpha, original_beta = alpha, beta
+        # the same pieces are another position when the other player is to move
+        key, mirrored = position.get_canonical_key(computer if maximizing_player else user)
+        entry = self.transposition_table.probe(key)
+        hash_move = None
+        if entry is not None:
+            entry_depth, flag, entry_value, hash_move = entry
+            if mirrored:
+                hash_move = position.mirror_column(hash_move)
+            # values depend on the remaining depth, so only same-depth results are reused
+            if entry_depth == depth:
+                if flag == EXACT:
+                    return entry_value
+                elif flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                elif flag == UPPER_BOUND:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+
+        if self.move_ordering:
+            player, opponent = (computer, user) if maximizing_player else (user, computer)
+            winning_moves = threats.winning_moves(player)
+            if winning_moves:
+                # the child would be a won game: nothing else can score better for the player to move
+                value = 100000000000000 if maximizing_player else -10000000000000
+                column = winning_moves[0]
+                self.transposition_table.store(key, depth, EXACT, value,
+                                               position.mirror_column(column) if mirrored else column)
+                return value
+            valid_locations = self._order_moves(threats, depth, player, opponent, hash_move)
+        else:
+            valid_locations = position.get_valid_moves()
+            if hash_move is not None:
+                valid_locations.remove(hash_move)
+                valid_locations.insert(0, hash_move)
 
+        best_column = valid_locations[0]
         if maximizing_player:
             value = -math.inf
             for column in valid_locations:
-                row = self.get_next_open_row(board, column)
-                temp_board = copy.deepcopy(board)
-                temp_board[row][column] = computer
-                new_score = self.minimax(temp_board, depth - 1, alpha, beta, False)
-                value = max(value, new_score)
+                row = threats.play(column, computer)
+                evaluator.play(row, column, computer)
+                try:
+                    new_score = self.minimax(position, depth - 1, alpha, beta, False, evaluator, threats)
+                finally:
+                    # a timed out or cancelled search leaves the position as it found it
+                    threats.undo()
+                    evaluator.undo(row, column, computer)
+                if new_score > value:
+                    value, best_column = new_score, column
                 alpha = max(alpha, value)
                 if alpha >= beta:
+                    if statistics is not None:
+                        statistics.cutoffs[valid_locations.index(column)] += 1
+                    if self.move_ordering:
+                        self._record_cutoff(threats, depth, computer, column)
                     break
-            return value
         else:
             value = math.inf
             for column in valid_locations:
-                row = self.get_next_open_row(board, column)
-                temp_board = copy.deepcopy(board)
-                temp_board[row][column] = user
-                new_score = self.minimax(temp_board, depth - 1, alpha, beta, True)
-                value = min(value, new_score)
+                row = threats.play(column, user)
+                evaluator.play(row, column, user)
+                try:
+                    new_score = self.minimax(position, depth - 1, alpha, beta, True, evaluator, threats)
+                finally:
+                    threats.undo()
+                    evaluator.undo(row, column, user)
+                if new_score < value:
+                    value, best_column = new_score, column
                 beta = min(beta, value)
                 if alpha >= beta:
+                    if statistics is not None:
+                        statistics.cutoffs[valid_locations.index(column)] += 1
+                    if self.move_ordering:
+                        self._record_cutoff(threats, depth, user, column)
                     break
-            return value
+
+        if value <= original_alpha:
+            flag = UPPER_BOUND
+        elif value >= original_beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, depth, flag, value, position.mirror_column(best_column) if mirrored else best_column)
+        return value
+
+    def _order_moves(self, threats, depth, player, opponent, hash_move):
+        # the hash move, the blocks of the opponent's immediate wins and the killer moves of this ply
+        # go first, then the other columns by history score, the centre first when the scores are equal;
+        # killers are kept per number of pieces on the board, which no search depth can run past
+        history = self._history[player]
+        centre_rank = self._centre_rank
+        valid_locations = sorted(threats.position.get_valid_moves(),
+                                 key=lambda column: (-history[column], centre_rank[column]))
+        first = threats.winning_moves(opponent) + self._killers[threats.position.get_mask().bit_count()]
+        if hash_move is not None:
+            first.insert(0, hash_move)
+        if not first:
+            return valid_locations
+        ordered = []
+        for column in first:
+            if column not in ordered and column in valid_locations:
+                ordered.append(column)
+        return ordered + [column for column in valid_locations if column not in ordered]
+
+    def _record_cutoff(self, threats, depth, player, column):
+        # the last two moves that refuted a position at this ply, and a score favouring deep refutations
+        killers = self._killers[threats.position.get_mask().bit_count()]
+        if column not in killers:
+            killers.insert(0, column)
+            del killers[2:]
+        self._history[player][column] += depth * depth
+
+    def principal_variation(self, position, column, depth):
+        # follows the best moves stored in the transposition table from the chosen root move
+        user, computer = '1', '2'
+        variation, player = [], computer
+        while column is not None and len(variation) < depth and position.can_play(column):
+            position.play(column, player)
+            variation.append(column)
+            if position.last_move_result()[0]:
+                break
+            player = user if player == computer else computer
+            key, mirrored = position.get_canonical_key(player)
+            entry = self.transposition_table.probe(key)
+            column = None if entry is None else position.mirror_column(entry[3]) if mirrored else entry[3]
+        for _ in variation:
+            position.undo()
+        return variation
 
     @staticmethod
     def get_next_open_row(board, column):
@@ -363,56 +1255,30 @@ class ComputerStrategy:
                 return row
 
     def score_position(self, board, player):
-        score = 0
-        opponent_piece = '1' if player == '2' else '2'
-        rows, columns = 6, 7
-
-        center_column = columns // 2
-        center_array = [board[row][center_column] for row in range(rows)]
-        center_count = center_array.count(player)
-        score += center_count * 3
-
-        # horizontal score
-        for row in range(rows):
-            row_array = [board[row][column] for column in range(columns)]
-            for column in range(columns - 3):
-                window = row_array[column:column + 4]
-                score += self.evaluate_window(window, player)
-
-        # vertical score
-        for column in range(columns):
-            col_array = [board[row][column] for row in range(rows)]
-            for row in range(rows - 3):
-                window = col_array[row:row + 4]
-                score += self.evaluate_window(window, player)
-
-        # upward diagonal score
-        for row in range(rows - 3):
-            for column in range(columns - 3):
-                window = [board[row + i][column + i] for i in range(4)]
-                score += self.evaluate_window(window, player)
-
-        # downward diagonal score
-        for row in range(3, rows):
-            for column in range(columns - 3):
-                window = [board[row - i][column + i] for i in range(4)]
-                score += self.evaluate_window(window, player)
-
+        geometry = self.geometry
+        # pieces in the center column (both middle ones on an even width) are worth 3 points each
+        score = 3 * sum(1 for row in range(1, geometry.rows + 1) for column in geometry.center_columns
+                        if board[row][column] == player)
+        for line in geometry.lines:
+            window = [board[row][column] for row, column in line]
+            score += self.evaluate_window(window, player)
         return score
 
     @staticmethod
     def evaluate_window(window, piece):
         score, empty_cell = 0, '0'
         opponent_piece = '1' if piece == '2' else '2'
+        # a window is as long as the line that wins, four cells on the standard board
+        piece_alignment = len(window)
 
-        if window.count(piece) == 4:
+        if window.count(piece) == piece_alignment:
             score += 100
-        elif window.count(piece) == 3 and window.count(empty_cell) == 1:
+        elif window.count(piece) == piece_alignment - 1 and window.count(empty_cell) == 1:
             score += 5
-        elif window.count(piece) == 2 and window.count(empty_cell) == 2:
+        elif window.count(piece) == piece_alignment - 2 and window.count(empty_cell) == 2:
             score += 2
 
-        if window.count(opponent_piece) == 3 and window.count(empty_cell) == 1:
+        if window.count(opponent_piece) == piece_alignment - 1 and window.count(empty_cell) == 1:
             score -= 4
 
         return score
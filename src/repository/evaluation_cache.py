@@ -0,0 +1,226 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from collections import OrderedDict
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'evaluation_cache.json')
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = EvaluationCache(capacity=2)
+
+    def test_get_and_put(self):
+        key = (3, 6, 7, 4, 1, 2)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, [4], False)
+        self.assertEqual(self.cache.get(key), ([4], False))
+        statistics = self.cache.get_statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['used']), (1, 1, 1))
+        self.assertEqual(statistics['hit_rate'], 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put('a', [1], False)
+        self.cache.put('b', [2], False)
+        self.cache.get('a')
+        self.cache.put('c', [3], False)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), ([1], False))
+        self.assertEqual(self.cache.get_statistics()['evictions'], 1)
+        self.cache.configure(1)
+        self.assertEqual(self.cache.get_statistics()['used'], 1)
+
+    def test_time_to_live(self):
+        cache = EvaluationCache(ttl=0.01)
+        cache.put('a', [1, 2], True)
+        self.assertEqual(cache.get('a'), ([1, 2], True))
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get_statistics()['expired'], 1)
+
+    def test_save_and_warm_start(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.json')
+        key = (2, 6, 7, 4, 2 ** 70, 5)
+        self.cache.put(key, [1, 3], True)
+        self.cache.save(path)
+        cache = EvaluationCache(warm_start_path=path)
+        self.assertEqual(cache.get(key), ([1, 3], True))
+        self.assertEqual(EvaluationCache(warm_start_path=path + '.missing').get(key), None)
+        with open(path, 'w') as file:
+            file.write('not a cache')
+        cache = EvaluationCache(warm_start_path=path)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.get_statistics()['used'], 0)
+        with open(path, 'w') as file:
+            json.dump({'version': CACHE_VERSION + 1, 'entries': [[list(key), [1, 3], True]]}, file)
+        self.assertIsNone(EvaluationCache(warm_start_path=path).get(key))
+        with open(path, 'w') as file:
+            json.dump({'version': CACHE_VERSION, 'entries': [[list(key)]]}, file)
+        self.assertIsNone(EvaluationCache(warm_start_path=path).get(key))
+
+    def test_fill_evaluation_cache(self):
+        medium, hard, plies = 2, 3, 2
+        cache = EvaluationCache()
+        self.assertEqual(fill_evaluation_cache(cache, plies), 1 + 7 + 49)
+        statistics = cache.get_statistics()
+        self.assertEqual(statistics['used'], 2 * (1 + 7 + 49))
+        self.assertEqual(cache.get((hard, 6, 7, 4, 0, 0)), ([1, 2, 3, 4, 5, 6, 7], True))
+        self.assertIsNotNone(cache.get((medium, 6, 7, 4, 1, 1 << 7)))
+
+
+class EvaluationCache:
+    """
+    Least recently used cache of the moves the Medium and Hard levels choose, shared by every
+    strategy of a process. A key names the level and the exact position; an entry holds the
+    columns the level picks from and whether it picks one of them at random, so a cached position
+    still draws its move as the level would. Entries can expire after `ttl` seconds, and a file
+    written by save (see build_evaluation_cache.py) is loaded on first use so new processes
+    don't start cold.
+    """
+
+    def __init__(self, capacity=2 ** 16, ttl=None, warm_start_path=None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.warm_start_path = warm_start_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._warm_started = False
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def configure(self, capacity, ttl=None, warm_start_path=None):
+        # changes the process-wide cache in place, so the strategies holding it keep it
+        with self._lock:
+            self.capacity, self.ttl = capacity, ttl
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if warm_start_path is not None:
+                self.warm_start_path = warm_start_path
+                self._warm_started = False
+
+    def _warm_start(self):
+        self._warm_started = True
+        if self.warm_start_path is None:
+            return
+        try:
+            entries = _read_entries(self.warm_start_path)
+        except (OSError, ValueError, TypeError, KeyError):
+            # a missing, unreadable or stale file only means the cache starts cold
+            return
+        for key, candidates, random_pick in entries:
+            self._store(key, candidates, random_pick)
+
+    def _store(self, key, candidates, random_pick):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (candidates, random_pick, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        # (candidates, random_pick) for the key, or None
+        with self._lock:
+            if not self._warm_started:
+                self._warm_start()
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key, candidates, random_pick):
+        with self._lock:
+            if not self._warm_started:
+                self._warm_start()
+            self._store(key, list(candidates), random_pick)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expired = self.evictions = 0
+
+    def get_statistics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'capacity': self.capacity,
+                'used': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def save(self, path):
+        # least recently used first, so loading the file gives back the same order; written to a
+        # temporary file first so a crash never leaves half a file behind
+        with self._lock:
+            entries = [[list(key) if isinstance(key, tuple) else key, candidates, random_pick]
+                       for key, (candidates, random_pick, _) in self._entries.items()]
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump({'version': CACHE_VERSION, 'entries': entries}, file)
+        os.replace(temporary_path, path)
+
+
+def _read_entries(path):
+    with open(path) as file:
+        try:
+            data = json.load(file)
+        except ValueError:
+            data = None
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        raise ValueError("Not an evaluation cache file")
+    return [(tuple(key) if isinstance(key, list) else key, candidates, random_pick)
+            for key, candidates, random_pick in data['entries']]
+
+
+def fill_evaluation_cache(cache, plies, rows=6, columns=7, connect=4):
+    # works out the Medium and Hard moves of every position up to `plies` moves from the empty board,
+    # the positions real games pass through most, and returns the number of positions
+    from src.domain.bitboard import BitBoard
+    from src.repository.board_repository import BoardActions, ComputerStrategy
+    user, computer = '1', '2'
+    position = BitBoard(rows, columns, connect)
+    computer_strategy = ComputerStrategy(BoardActions(position, None), opening_book_path=None,
+                                         evaluation_cache=cache)
+    seen = set()
+
+    def visit(depth):
+        key = (position.get_pieces(user), position.get_pieces(computer))
+        if key in seen or position.last_move_result()[0]:
+            return
+        seen.add(key)
+        computer_strategy.medium_difficulty_move()
+        computer_strategy.hard_difficulty_move()
+        if depth < plies:
+            for column in position.get_valid_moves():
+                position.play(column, user if depth % 2 == 0 else computer)
+                visit(depth + 1)
+                position.undo()
+
+    visit(0)
+    return len(seen)
+
+
+# the cache of the strategies of this process, warm started from the file build_evaluation_cache.py writes
+EVALUATION_CACHE = EvaluationCache(warm_start_path=DEFAULT_CACHE_PATH)
+
+
+if __name__ == '__main__':
+    unittest.main()
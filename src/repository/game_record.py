@@ -0,0 +1,232 @@
+import os
+import struct
+import tempfile
+import unittest
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions
+
+RECORD_MAGIC = b'C4GR'
+RECORD_VERSION = 2
+FILE_HEADER = struct.Struct('<4sB')
+RECORD_HEADER = struct.Struct('<BBBBQB')
+MAX_SEED = 2 ** 64 - 1
+UNFINISHED, FIRST_PLAYER_WON, SECOND_PLAYER_WON, DRAW = 0, 1, 2, 3
+HUMAN = 0
+_HAS_SEED = 1
+
+
+class TestGameRecord(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'games.c4gr')
+        self.record = GameRecord([4, 4, 3, 5, 2, 1, 1], (HUMAN, 4), seed=17, result=FIRST_PLAYER_WON)
+
+    def test_pack_and_unpack(self):
+        data = self.record.pack()
+        self.assertEqual(len(data), RECORD_HEADER.size + 4)
+        record, offset = GameRecord.unpack(data)
+        self.assertEqual(offset, len(data))
+        self.assertEqual(record, self.record)
+        record, _ = GameRecord.unpack(GameRecord([], (1, 2)).pack())
+        self.assertEqual((record.columns, record.seed, record.result), ([], None, UNFINISHED))
+
+    def test_seeds(self):
+        for seed in (0, 2 ** 32 + 5, MAX_SEED):
+            self.assertEqual(GameRecord.unpack(GameRecord([4], (1, 2), seed).pack())[0].seed, seed)
+        for seed in (-1, MAX_SEED + 1):
+            with self.assertRaises(ValueError):
+                GameRecord([4], (1, 2), seed).pack()
+
+    def test_write_and_stream(self):
+        records = [GameRecord([column] * (column % 6 + 1), (column % 5, 4), seed=column) for column in range(1, 8)]
+        with GameRecordWriter(self.path) as writer:
+            for record in records[:3]:
+                writer.write(record)
+        # appending to an existing file keeps its header and records
+        with GameRecordWriter(self.path) as writer:
+            for record in records[3:]:
+                writer.write(record)
+        streamed = read_game_records(self.path)
+        self.assertEqual(next(streamed), records[0])
+        self.assertEqual(list(streamed), records[1:])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a record file')
+        with self.assertRaises(ValueError):
+            list(read_game_records(self.path))
+
+    def test_rejects_truncated_files(self):
+        with GameRecordWriter(self.path) as writer:
+            writer.write(self.record)
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            list(read_game_records(self.path))
+
+    def test_replay(self):
+        user, computer, empty = '1', '2', '0'
+        replay = GameReplay(self.record)
+        self.assertEqual(len(replay), len(self.record.columns))
+        board = replay.board_action(2).get_board()
+        self.assertEqual((board[6][4], board[5][4], board[6][3]), (user, computer, empty))
+        board = replay.board_action(7).get_board()
+        self.assertEqual((board[6][1], board[5][1]), (computer, user))
+        self.assertIs(replay.board_action(0).get_board(), board)
+        self.assertEqual(board[6][4], empty)
+        self.assertEqual(sum(1 for _ in replay.positions()), len(replay) + 1)
+        self.assertEqual(replay.board_action(len(replay)).is_game_over(), (False, None))
+
+    def test_swapped_replay(self):
+        user, computer = '1', '2'
+        board = GameReplay(self.record, swapped=True).board_action(2).get_board()
+        self.assertEqual((board[6][4], board[5][4]), (computer, user))
+
+    def test_from_bitboard(self):
+        user, computer = '1', '2'
+        position = BitBoard()
+        for column, player in ((4, user), (3, computer), (4, user)):
+            position.play(column, player)
+        record = GameRecord.from_bitboard(position, (HUMAN, 3), seed=5)
+        self.assertEqual((record.columns, record.result), ([4, 3, 4], UNFINISHED))
+
+
+class GameRecord:
+    """
+    One game as the sequence of its columns, with the difficulty of both players (0 for a
+    human), the seed of the game and its result. The first player plays the '1' pieces.
+    Packed, a record is a 13-byte header followed by the columns stored two per byte.
+    """
+
+    def __init__(self, columns, difficulties, seed=None, result=UNFINISHED):
+        self.columns = list(columns)
+        self.difficulties = tuple(difficulties)
+        self.seed = seed
+        self.result = result
+
+    @classmethod
+    def from_bitboard(cls, position, difficulties, seed=None):
+        user, computer = '1', '2'
+        columns = position.get_moves()
+        game_over, winner = position.last_move_result()
+        result = UNFINISHED
+        if game_over:
+            result = {user: FIRST_PLAYER_WON, computer: SECOND_PLAYER_WON, None: DRAW}[winner]
+        return cls(columns, difficulties, seed, result)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and (self.columns, self.difficulties, self.seed, self.result) == \
+            (other.columns, other.difficulties, other.seed, other.result)
+
+    def __repr__(self):
+        return f"GameRecord({self.columns}, {self.difficulties}, seed={self.seed}, result={self.result})"
+
+    def pack(self):
+        columns = self.columns + [0] * (len(self.columns) % 2)
+        moves = bytes(columns[index] | columns[index + 1] << 4 for index in range(0, len(columns), 2))
+        flags = _HAS_SEED if self.seed is not None else 0
+        if self.seed is not None and not 0 <= self.seed <= MAX_SEED:
+            raise ValueError("Recorded seeds must be between 0 and 2 ** 64 - 1")
+        return RECORD_HEADER.pack(*self.difficulties, self.result, flags, self.seed or 0,
+                                  len(self.columns)) + moves
+
+    @classmethod
+    def unpack(cls, data, offset=0):
+        first_difficulty, second_difficulty, result, flags, seed, plies = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        end = offset + (plies + 1) // 2
+        if end > len(data):
+            raise ValueError("Truncated game record")
+        columns = []
+        for byte in data[offset:end]:
+            columns += (byte & 15, byte >> 4)
+        return cls(columns[:plies], (first_difficulty, second_difficulty), seed if flags & _HAS_SEED else None,
+                   result), end
+
+
+class GameRecordWriter:
+    """
+    Appends packed records to a game archive, writing the file header first when the file is new.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(RECORD_MAGIC, RECORD_VERSION))
+
+    def write(self, record):
+        self._file.write(record.pack())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def read_game_records(path, buffer_size=1 << 16):
+    # streams the records through a fixed-size buffer, so archives of any size use little memory
+    with open(path, 'rb') as file:
+        header = file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (RECORD_MAGIC, RECORD_VERSION):
+            raise ValueError("Not a game record file")
+        data, offset = b'', 0
+        while True:
+            chunk = file.read(buffer_size)
+            data = data[offset:] + chunk
+            offset = 0
+            while offset + RECORD_HEADER.size <= len(data):
+                plies = data[offset + RECORD_HEADER.size - 1]
+                if offset + RECORD_HEADER.size + (plies + 1) // 2 > len(data):
+                    break
+                record, offset = GameRecord.unpack(data, offset)
+                yield record
+            if not chunk:
+                if offset < len(data):
+                    raise ValueError("Truncated game record")
+                return
+
+
+class GameReplay:
+    """
+    Rebuilds the board of a recorded game at any ply. One BoardActions is kept and moved
+    forwards or backwards from its current ply, so stepping through a game plays every
+    move once. With swapped=True the first player gets the '2' pieces, so the second
+    player's moves can be looked at from the computer's side.
+    """
+
+    def __init__(self, record, swapped=False):
+        self.record = record
+        self._pieces = ('2', '1') if swapped else ('1', '2')
+        self._position = BitBoard()
+        self._board_action = BoardActions(self._position, None)
+        self._ply = 0
+
+    def __len__(self):
+        return len(self.record.columns)
+
+    def board_action(self, ply):
+        if ply < 0 or ply > len(self):
+            raise IndexError("Ply out of range")
+        while self._ply > ply:
+            self._position.undo()
+            self._ply -= 1
+        while self._ply < ply:
+            self._position.play(self.record.columns[self._ply], self._pieces[self._ply % 2])
+            self._ply += 1
+        return self._board_action
+
+    def position(self, ply):
+        self.board_action(ply)
+        return self._position
+
+    def positions(self):
+        # the BitBoard before every move, then after the last one; it changes in place as the generator advances
+        for ply in range(len(self) + 1):
+            yield self.position(ply)
+
+
+if __name__ == '__main__':
+    unittest.main()
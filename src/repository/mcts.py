@@ -0,0 +1,332 @@
+import functools
+import math
+import random
+import time
+import unittest
+from array import array
+from src.domain.bitboard import BitBoard
+
+
+class TestMonteCarloTreeSearch(unittest.TestCase):
+    def setUp(self):
+        self.position = BitBoard()
+        self.engine = MonteCarloTreeSearch(self.position.geometry, seed=1)
+
+    def play(self, moves):
+        user, computer = '1', '2'
+        for ply, column in enumerate(moves):
+            self.position.play(column, user if ply % 2 == 0 else computer)
+
+    def test_takes_the_win(self):
+        computer = '2'
+        self.play([1, 5, 1, 5, 2, 5])
+        self.assertEqual(self.engine.best_move(self.position, computer, iterations=2000), 5)
+
+    def test_blocks(self):
+        computer = '2'
+        self.play([4, 1, 4, 1, 4])
+        self.assertEqual(self.engine.best_move(self.position, computer, iterations=3000), 4)
+
+    def test_tree_reuse(self):
+        user, computer = '1', '2'
+        self.play([4])
+        column = self.engine.best_move(self.position, computer, iterations=3000)
+        self.assertEqual(self.engine.reused, 0)
+        self.position.play(column, computer)
+        self.position.play(3, user)
+        self.engine.best_move(self.position, computer, iterations=100)
+        self.assertGreater(self.engine.reused, 1)
+        # a position that doesn't follow from the last one starts a new tree
+        other = BitBoard()
+        other.play(1, user)
+        self.engine.best_move(other, computer, iterations=100)
+        self.assertEqual(self.engine.reused, 0)
+
+    def test_node_limit(self):
+        computer, max_nodes = '2', 500
+        engine = MonteCarloTreeSearch(self.position.geometry, max_nodes=max_nodes, seed=2)
+        self.play([4])
+        self.assertIn(engine.best_move(self.position, computer, iterations=5000), range(1, 8))
+        self.assertLessEqual(engine.node_count(), max_nodes)
+        self.assertEqual(engine.iterations, 5000)
+        self.assertEqual(sum(engine.root_visits().values()), engine.iterations)
+
+    def test_time_budget(self):
+        computer, time_budget = '2', 0.05
+        start = time.perf_counter()
+        self.engine.best_move(self.position, computer, time_budget)
+        self.assertLess(time.perf_counter() - start, time_budget + 0.05)
+        self.assertGreater(self.engine.iterations, 0)
+
+    def test_stop(self):
+        computer = '2'
+        self.assertIn(self.engine.best_move(self.position, computer, 10, stop=lambda: True), range(1, 8))
+
+    def test_random_playout(self):
+        user = '1'
+        generator = random.Random(3)
+        tables = playout_tables(6, 7, 4)
+        self.play([1, 2, 1, 2, 1, 2])
+        # the user can win at once, and loses every game that goes on
+        results = {random_playout(tables, self.position.get_pieces(user), self.position.get_mask(), generator)
+                   for _ in range(200)}
+        self.assertEqual(results, {-1, 1})
+        self.assertIn(random_playout(tables, 0, 0, generator), (-1, 0, 1))
+
+    def test_other_geometry(self):
+        user, computer = '1', '2'
+        position = BitBoard(7, 9, 5)
+        for column in (2, 3, 4, 5):
+            position.play(column, user)
+            position.play(column, computer)
+        engine = MonteCarloTreeSearch(position.geometry, seed=4)
+        self.assertIn(engine.best_move(position, user, iterations=1000), (1, 6))
+
+
+@functools.lru_cache(maxsize=None)
+def playout_tables(rows, columns, connect):
+    # the bottom and top cell of every column (0-based) and, per direction, the shifts that shrink a
+    # run of `connect` pieces to a single bit (1, 2, 4, ... then the rest, as in BitBoard.is_winner)
+    column_bits = rows + 1
+    bottom = [1 << (column * column_bits) for column in range(columns)]
+    top = [1 << (column * column_bits + rows - 1) for column in range(columns)]
+    steps, length = [], 1
+    while length < connect:
+        step = min(length, connect - length)
+        steps.append(step)
+        length += step
+    runs = tuple(tuple(step * shift for step in steps)
+                 for shift in (1, column_bits, column_bits - 1, column_bits + 1))
+    return bottom, top, runs
+
+
+def is_line(pieces, runs):
+    for distances in runs:
+        run = pieces
+        for distance in distances:
+            run &= run >> distance
+        if run:
+            return True
+    return False
+
+
+def random_playout(tables, pieces, mask, generator=random):
+    """
+    Plays random moves from a position until it ends, on plain integers laid out as in BitBoard.
+    pieces are the stones of the player to move and mask all the stones. Returns 1 if the player
+    to move wins, -1 if the other player does and 0 for a draw.
+    """
+    bottom, top, runs = tables
+    open_columns = [column for column in range(len(bottom)) if not mask & top[column]]
+    # indexing with random() draws a column in about half the time of choice()
+    draw = generator.random
+    count = len(open_columns)
+    result = 1
+    while count:
+        column = open_columns[int(draw() * count)]
+        new_mask = mask | (mask + bottom[column])
+        pieces |= new_mask ^ mask
+        if is_line(pieces, runs):
+            return result
+        if new_mask & top[column]:
+            open_columns.remove(column)
+            count -= 1
+        # the other player moves next
+        pieces ^= new_mask
+        mask = new_mask
+        result = -result
+    return 0
+
+
+class MonteCarloTreeSearch:
+    """
+    Monte Carlo tree search with UCT selection and random playouts. The nodes live in flat arrays
+    indexed by node number, the children of a node side by side, so the tree costs about 20 bytes a
+    node and never holds more than max_nodes of them; past that the leaves are only played out.
+    The tree of the last search is kept, and a search from a position that follows from it (the
+    engine's move and the reply) starts from the matching subtree.
+    """
+
+    def __init__(self, geometry, max_nodes=2 ** 18, exploration=1.4, seed=None):
+        self.geometry = geometry
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.generator = random if seed is None else random.Random(seed)
+        self.tables = playout_tables(geometry.rows, geometry.columns, geometry.connect)
+        self.iterations = 0
+        # nodes of the last search that were kept from the one before
+        self.reused = 0
+        self._root_pieces = None
+        self._clear()
+
+    def _clear(self):
+        # per node: visits, wins of the player who moved into it (draws count half), first child, number
+        # of children, column played into it (0-based) and state: 0 not looked at yet, 1 game goes on,
+        # 2 the move into it won, 3 drawn
+        self._visits = array('i', [0])
+        self._wins = array('d', [0.0])
+        self._first_child = array('i', [0])
+        self._child_count = array('b', [0])
+        self._column = array('b', [-1])
+        self._state = array('b', [1])
+
+    def node_count(self):
+        return len(self._visits)
+
+    def best_move(self, position, player, time_budget=None, iterations=None, stop=None):
+        """
+        The column to play for `player` on a BitBoard, the most visited move after searching for
+        time_budget seconds or the given number of iterations, whichever ends first. stop is
+        called now and then and ends the search when it returns True.
+        """
+        user, computer = '1', '2'
+        if time_budget is None and iterations is None:
+            raise ValueError("The search needs a time budget or a number of iterations")
+        opponent = computer if player == user else user
+        pieces = {player: position.get_pieces(player), opponent: position.get_pieces(opponent)}
+        self._set_root(pieces, player)
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        own, mask = pieces[player], position.get_mask()
+        self.iterations = 0
+        while iterations is None or self.iterations < iterations:
+            if self.iterations % 64 == 0 and self.iterations:
+                if (deadline is not None and time.perf_counter() >= deadline) or (stop is not None and stop()):
+                    break
+            self._iterate(own, mask)
+            self.iterations += 1
+        return self._most_visited()
+
+    def _set_root(self, pieces, player):
+        # looks for the position among the descendants of the last root, playing moves alternately
+        previous, self._root_pieces = self._root_pieces, (pieces, player)
+        self.reused = 0
+        if previous is None:
+            self._clear()
+            return
+        previous_pieces, previous_player = previous
+        user, computer = '1', '2'
+        bottom = self.tables[0]
+        mover = previous_player
+        stones = dict(previous_pieces)
+        node = 0
+        while stones != pieces:
+            if stones[user] & ~pieces[user] or stones[computer] & ~pieces[computer]:
+                break
+            mask = stones[user] | stones[computer]
+            start, count = self._first_child[node], self._child_count[node]
+            for child in range(start, start + count):
+                cell = (mask + bottom[self._column[child]]) & ~mask
+                if cell & pieces[mover]:
+                    stones[mover] |= cell
+                    node = child
+                    break
+            else:
+                break
+            mover = computer if mover == user else user
+        if stones != pieces or mover != player:
+            self._clear()
+            return
+        if node:
+            self._keep_subtree(node)
+        self.reused = len(self._visits)
+
+    def _keep_subtree(self, root):
+        # copies the subtree under `root` into new arrays, children blocks staying side by side
+        visits, wins, first_child = self._visits, self._wins, self._first_child
+        child_count, column, state = self._child_count, self._column, self._state
+        self._clear()
+        self._visits[0], self._wins[0], self._state[0] = visits[root], wins[root], state[root]
+        queue = [(root, 0)]
+        for old, new in queue:
+            count = child_count[old]
+            if not count:
+                continue
+            start = first_child[old]
+            self._first_child[new], self._child_count[new] = len(self._visits), count
+            for child in range(start, start + count):
+                queue.append((child, len(self._visits)))
+                self._visits.append(visits[child])
+                self._wins.append(wins[child])
+                self._first_child.append(0)
+                self._child_count.append(0)
+                self._column.append(column[child])
+                self._state.append(state[child])
+
+    def _expand(self, node, mask):
+        top = self.tables[1]
+        self._first_child[node] = len(self._visits)
+        count = 0
+        for column in range(self.geometry.columns):
+            if not mask & top[column]:
+                self._visits.append(0)
+                self._wins.append(0.0)
+                self._first_child.append(0)
+                self._child_count.append(0)
+                self._column.append(column)
+                self._state.append(0)
+                count += 1
+        self._child_count[node] = count
+
+    def _iterate(self, pieces, mask):
+        bottom, top, runs = self.tables
+        visits, wins, state = self._visits, self._wins, self._state
+        node = 0
+        path = [0]
+        while True:
+            if state[node] == 0:
+                # pieces are the stones of the player to move, the move into the node was the other one's
+                if is_line(pieces ^ mask, runs):
+                    state[node] = 2
+                elif all(mask & cell for cell in top):
+                    state[node] = 3
+                else:
+                    state[node] = 1
+            if state[node] != 1:
+                reward = 1.0 if state[node] == 2 else 0.5
+                break
+            count = self._child_count[node]
+            if not count:
+                # the root always gets its children, other leaves on their second visit while there is room
+                if node == 0 or visits[node] and len(visits) + self.geometry.columns <= self.max_nodes:
+                    self._expand(node, mask)
+                    count = self._child_count[node]
+                if not count:
+                    # a playout result for the player to move, turned into one for the player who moved here
+                    reward = (1 - random_playout(self.tables, pieces, mask, self.generator)) / 2
+                    break
+            start = self._first_child[node]
+            best, best_value = start, -1.0
+            exploration = self.exploration * math.sqrt(math.log(visits[node] or 1))
+            for child in range(start, start + count):
+                child_visits = visits[child]
+                if not child_visits:
+                    best = child
+                    break
+                value = wins[child] / child_visits + exploration / math.sqrt(child_visits)
+                if value > best_value:
+                    best, best_value = child, value
+            new_mask = mask | (mask + bottom[self._column[best]])
+            pieces = (pieces | (new_mask ^ mask)) ^ new_mask
+            mask = new_mask
+            node = best
+            path.append(node)
+        for node in reversed(path):
+            visits[node] += 1
+            wins[node] += reward
+            reward = 1 - reward
+
+    def root_visits(self):
+        # the visits of every move of the root, by column
+        start, count = self._first_child[0], self._child_count[0]
+        return {self._column[child] + 1: self._visits[child] for child in range(start, start + count)}
+
+    def _most_visited(self):
+        start, count = self._first_child[0], self._child_count[0]
+        if not count:
+            return None
+        best = max(range(start, start + count), key=lambda child: (self._visits[child], -child))
+        return self._column[best] + 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+import tempfile
+import unittest
+from src.repository.solver import Solver, position_from_moves, canonical_key, play_move, can_win_next, \
+    top_mask_column, WIDTH, HEIGHT
+
+BOOK_MAGIC = b'C4OB'
+BOOK_VERSION = 2
+HEADER = struct.Struct('<4sBBBI')
+RECORD = struct.Struct('<QbB')
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+_open_books = {}
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'book.bin')
+        write_opening_book(self.path, {5: (1, 3), 2: (-1, 7), 9: (0, 4)})
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+
+    def test_get(self):
+        self.assertEqual(len(self.book), 3)
+        self.assertEqual(self.book.get(2), (-1, 7))
+        self.assertEqual(self.book.get(5), (1, 3))
+        self.assertEqual(self.book.get(9), (0, 4))
+        self.assertIsNone(self.book.get(1))
+        self.assertIsNone(self.book.get(6))
+        self.assertIsNone(self.book.get(10))
+
+    def test_file_size(self):
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + 3 * RECORD.size)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a book')
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_open_shares_books(self):
+        book = OpeningBook.open(self.path)
+        self.assertIs(OpeningBook.open(self.path), book)
+
+    def test_build_opening_book(self):
+        # a late position keeps the solving time of the test short
+        start_moves = [int(column) for column in '2252576253462244111563365343671351441']
+        solver = Solver()
+        entries = build_opening_book(1, solver, start_moves=start_moves)
+        position, mask, moves = position_from_moves(start_moves)
+        column, score = solver.best_move(position, mask, moves)
+        key, mirrored = canonical_key(position, mask)
+        self.assertGreater(len(entries), 1)
+        self.assertEqual(entries[key], (score, WIDTH + 1 - column if mirrored else column))
+
+
+class OpeningBook:
+    """
+    Read-only book of solved positions. The file is a header followed by fixed-size records
+    (canonical key, score, best column of the canonical position) sorted by key; it is memory
+    mapped and searched in place, so opening it costs nothing and worker processes share the
+    same pages.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            self._data.close()
+            raise ValueError("Not an opening book file")
+        magic, version, width, height, self._count = HEADER.unpack_from(self._data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION or (width, height) != (WIDTH, HEIGHT) \
+                or len(self._data) < HEADER.size + self._count * RECORD.size:
+            self._data.close()
+            raise ValueError("Not an opening book file")
+
+    @classmethod
+    def open(cls, path):
+        path = os.path.abspath(path)
+        if path not in _open_books:
+            _open_books[path] = cls(path)
+        return _open_books[path]
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key):
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record_key, score, column = RECORD.unpack_from(self._data, HEADER.size + middle * RECORD.size)
+            if record_key == key:
+                return score, column
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        self._data.close()
+
+
+def write_opening_book(path, entries):
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, WIDTH, HEIGHT, len(entries)))
+        for key in sorted(entries):
+            score, column = entries[key]
+            file.write(RECORD.pack(key, score, column))
+
+
+def build_opening_book(plies, solver, start_moves=(), progress=None):
+    entries = {}
+    start_position, start_mask, start_count = position_from_moves(start_moves)
+    pending = [(start_position, start_mask, start_count)]
+    while pending:
+        position, mask, moves = pending.pop()
+        key, mirrored = canonical_key(position, mask)
+        if key in entries or moves == WIDTH * HEIGHT or can_win_next(position, mask):
+            # positions with an immediate win need no book entry, the solver finds them at once
+            continue
+        column, score = solver.best_move(position, mask, moves)
+        entries[key] = (score, WIDTH + 1 - column if mirrored else column)
+        if progress is not None:
+            progress(len(entries))
+        if moves - start_count < plies:
+            for next_column in range(WIDTH):
+                if not mask & top_mask_column(next_column):
+                    pending.append((*play_move(position, mask, next_column), moves + 1))
+    return entries
+
+
+if __name__ == '__main__':
+    unittest.main()
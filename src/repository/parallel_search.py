@@ -0,0 +1,136 @@
+import math
+import os
+import random
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy, SearchTimeout
+
+_worker_strategies = {}
+_worker_table_size = 2 ** 16
+
+
+class TestParallelRootSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.parallel_search = ParallelRootSearch(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parallel_search.shutdown()
+
+    def setUp(self):
+        self.board_action = BoardActions(BitBoard(), None)
+        self.computer_strategy = ComputerStrategy(self.board_action)
+
+    def test_same_move_as_sequential_search(self):
+        generator, depth = random.Random(5), 4
+        parallel_strategy = ComputerStrategy(self.board_action, parallel_search=self.parallel_search)
+        for _ in range(8):
+            self.board_action.restart_game()
+            for move in range(generator.randint(2, 16)):
+                self.board_action.add_move_on_board(generator.choice(self.computer_strategy.get_valid_moves()),
+                                                    '1' if move % 2 == 0 else '2')
+                if self.board_action.is_game_over()[0]:
+                    self.board_action.restart_game()
+            position = BitBoard.from_grid(self.board_action.get_board())
+            valid_locations = position.get_valid_moves()
+            self.assertEqual(self.parallel_search.search(position, valid_locations, depth),
+                             self.computer_strategy._search_root(position, valid_locations, depth))
+            random.seed(1)
+            move = self.computer_strategy.godlike_difficulty_move(depth)
+            random.seed(1)
+            self.assertEqual(parallel_strategy.godlike_difficulty_move(depth), move)
+
+    def test_time_budget(self):
+        maximum_depth, time_budget = 42, 0.2
+        parallel_strategy = ComputerStrategy(self.board_action, parallel_search=self.parallel_search)
+        start = time.perf_counter()
+        move = parallel_strategy.godlike_difficulty_move(maximum_depth, time_budget)
+        self.assertLess(time.perf_counter() - start, time_budget + 0.5)
+        self.assertIn(move, self.computer_strategy.get_valid_moves())
+
+    def test_other_geometry(self):
+        user, depth = '1', 3
+        board_action = BoardActions(BitBoard(7, 9, 5), None)
+        for column in (6, 7, 8, 9):
+            board_action.add_move_on_board(column, user)
+        position = board_action.get_position()
+        valid_locations = position.get_valid_moves()
+        self.assertEqual(self.parallel_search.search(position, valid_locations, depth),
+                         ComputerStrategy(board_action)._search_root(position, valid_locations, depth))
+
+    def test_timeout(self):
+        depth = 42
+        position = BitBoard()
+        with self.assertRaises(SearchTimeout):
+            self.parallel_search.search(position, position.get_valid_moves(), depth, time.perf_counter() + 0.05)
+
+
+def _initialize_worker(transposition_table_size):
+    global _worker_table_size
+    _worker_table_size = transposition_table_size
+
+
+def _worker_strategy(geometry):
+    # one strategy per board size in every worker, as its move ordering tables are sized by the board
+    if geometry not in _worker_strategies:
+        position = BitBoard(geometry.rows, geometry.columns, geometry.connect)
+        _worker_strategies[geometry] = ComputerStrategy(BoardActions(position, None), _worker_table_size)
+    return _worker_strategies[geometry]
+
+
+def _score_root_move(grid, connect, column, depth, time_left):
+    computer = '2'
+    position = BitBoard.from_grid(grid, connect)
+    position.play(column, computer)
+    worker_strategy = _worker_strategy(position.geometry)
+    worker_strategy.new_search()
+    if time_left is not None:
+        worker_strategy._deadline = time.perf_counter() + time_left
+    try:
+        return worker_strategy.minimax(position, depth - 1, -math.inf, math.inf, False)
+    except SearchTimeout:
+        return None
+    finally:
+        worker_strategy._deadline = None
+
+
+class ParallelRootSearch:
+    """
+    Scores the root moves of a Godlike search in a pool of worker processes. The pool is
+    started once and kept warm, and every worker keeps its own transposition table between
+    moves.
+    """
+
+    def __init__(self, workers=None, transposition_table_size=2 ** 16):
+        self.workers = workers or os.cpu_count()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_worker,
+                                             initargs=(transposition_table_size,))
+        # start every worker now rather than on the first searched move
+        list(self._executor.map(abs, range(self.workers)))
+
+    def search(self, position, valid_locations, depth, deadline=None):
+        grid = position.to_grid()
+        time_left = None if deadline is None else deadline - time.perf_counter()
+        futures = [self._executor.submit(_score_root_move, grid, position.geometry.connect, column, depth, time_left)
+                   for column in valid_locations]
+        best_score, best_column = -math.inf, valid_locations[0]
+        for column, future in zip(valid_locations, futures):
+            score = future.result()
+            if score is None:
+                for pending in futures:
+                    pending.cancel()
+                raise SearchTimeout()
+            # same tie-break as the sequential search: the leftmost column wins
+            if score > best_score or (score == best_score and column < best_column):
+                best_score, best_column = score, column
+        return best_column, best_score
+
+    def shutdown(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
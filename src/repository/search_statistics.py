@@ -0,0 +1,69 @@
+import unittest
+
+
+class TestSearchStatistics(unittest.TestCase):
+    def setUp(self):
+        self.statistics = SearchStatistics()
+
+    def test_initial_values(self):
+        columns = 7
+        self.assertEqual(self.statistics.nodes, 0)
+        self.assertEqual(self.statistics.cutoffs, [0] * columns)
+        self.assertIsNone(self.statistics.column)
+
+    def test_to_dict(self):
+        self.statistics.column, self.statistics.source = 4, 'search'
+        self.statistics.cutoffs[0] += 3
+        self.statistics.root_move_times[4] = 0.5
+        statistics = self.statistics.to_dict()
+        self.assertEqual(statistics['column'], 4)
+        self.assertEqual(statistics['cutoffs'], [3, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(statistics['root_move_times'], {4: 0.5})
+        statistics['cutoffs'][0] = 0
+        self.assertEqual(self.statistics.cutoffs[0], 3)
+
+    def test_other_width(self):
+        columns = 9
+        self.assertEqual(SearchStatistics(columns).cutoffs, [0] * columns)
+
+
+class SearchStatistics:
+    """
+    What the computer did to choose one move: where the move came from (block, win, book,
+    solver, search or mcts), the nodes, leaf evaluations and transposition table hits of the search,
+    the beta cutoffs by index of the move that caused them, the deepest ply reached, the time
+    spent under every root move and the principal variation.
+    """
+
+    def __init__(self, columns=7):
+        self.column = None
+        self.source = None
+        self.depth = 0
+        self.search_depth = 0
+        self.nodes = 0
+        self.leaf_evaluations = 0
+        self.cache_hits = 0
+        self.cutoffs = [0] * columns
+        self.max_depth = 0
+        self.root_move_times = {}
+        self.principal_variation = []
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        return {
+            'column': self.column,
+            'source': self.source,
+            'depth': self.depth,
+            'nodes': self.nodes,
+            'leaf_evaluations': self.leaf_evaluations,
+            'cache_hits': self.cache_hits,
+            'cutoffs': list(self.cutoffs),
+            'max_depth': self.max_depth,
+            'root_move_times': dict(self.root_move_times),
+            'principal_variation': list(self.principal_variation),
+            'elapsed': self.elapsed,
+        }
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,263 @@
+import time
+import unittest
+from src.repository.transposition_table import TranspositionTable, UPPER_BOUND
+
+WIDTH, HEIGHT = 7, 6
+COLUMN_BITS = HEIGHT + 1
+BOTTOM_MASK = sum(1 << (column * COLUMN_BITS) for column in range(WIDTH))
+BOARD_MASK = BOTTOM_MASK * ((1 << HEIGHT) - 1)
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+CENTER_FIRST_ORDER = [WIDTH // 2 + (1 - 2 * (index % 2)) * (index + 1) // 2 for index in range(WIDTH)]
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+class TestSolver(unittest.TestCase):
+    def setUp(self):
+        self.solver = Solver()
+
+    def test_center_first_order(self):
+        self.assertEqual(CENTER_FIRST_ORDER, [3, 2, 4, 1, 5, 0, 6])
+
+    def test_solve_immediate_win(self):
+        position, mask, moves = position_from_moves([1, 2, 1, 2, 1, 2])
+        self.assertEqual(self.solver.solve(position, mask, moves), (WIDTH * HEIGHT + 1 - moves) // 2)
+        self.assertEqual(self.solver.best_move(position, mask, moves)[0], 1)
+
+    def test_solve_known_positions(self):
+        # scores confirmed with a plain exhaustive alpha-beta search
+        for sequence, score in (('2252576253462244111563365343671351441', -1),
+                                ('7422341735647741166133573473242566', 1),
+                                ('23163416124767223154467471272416755633', 0)):
+            position, mask, moves = position_from_moves([int(column) for column in sequence])
+            self.assertEqual(self.solver.solve(position, mask, moves), score)
+
+    def test_best_move(self):
+        position, mask, moves = position_from_moves([int(column) for column in '7422341735647741166133573473242566'])
+        column, score = self.solver.best_move(position, mask, moves)
+        self.assertEqual(score, self.solver.solve(position, mask, moves))
+        child = play_move(position, mask, column - 1)
+        self.assertEqual(-self.solver.solve(*child, moves + 1), score)
+
+    def test_timeout(self):
+        position, mask, moves = position_from_moves([])
+        with self.assertRaises(SolverTimeout):
+            self.solver.solve(position, mask, moves, time_budget=0.01)
+
+    def test_opening_book_is_used(self):
+        position, mask, moves = position_from_moves([])
+        book = {position_key(position, mask): (1, 4)}
+        solver = Solver(opening_book=book)
+        self.assertEqual(solver.best_move(position, mask, moves), (4, 1))
+
+    def test_opening_book_is_used_for_mirrored_position(self):
+        position, mask, moves = position_from_moves([2])
+        mirrored_position, mirrored_mask, _ = position_from_moves([6])
+        key, mirrored = canonical_key(position, mask)
+        self.assertFalse(mirrored)
+        solver = Solver(opening_book={key: (-1, 3)})
+        self.assertEqual(solver.best_move(position, mask, moves), (3, -1))
+        self.assertEqual(solver.best_move(mirrored_position, mirrored_mask, moves), (5, -1))
+
+    def test_canonical_key(self):
+        position, mask, _ = position_from_moves([1, 2, 2])
+        mirrored_position, mirrored_mask, _ = position_from_moves([7, 6, 6])
+        self.assertEqual(canonical_key(position, mask)[0], canonical_key(mirrored_position, mirrored_mask)[0])
+        self.assertNotEqual(canonical_key(position, mask)[1], canonical_key(mirrored_position, mirrored_mask)[1])
+
+
+def position_from_moves(columns):
+    position, mask = 0, 0
+    for column in columns:
+        position, mask = play_move(position, mask, column - 1)
+    return position, mask, len(columns)
+
+
+def position_key(position, mask):
+    return position + mask
+
+
+def mirror_bits(bits):
+    mirrored = 0
+    for column in range(WIDTH):
+        mirrored |= ((bits >> (column * COLUMN_BITS)) & COLUMN_MASK) << ((WIDTH - 1 - column) * COLUMN_BITS)
+    return mirrored
+
+
+def canonical_key(position, mask):
+    # every column of a key fits in its own seven bits, so mirroring the key mirrors the position
+    key = position_key(position, mask)
+    mirrored_key = mirror_bits(key)
+    if mirrored_key < key:
+        return mirrored_key, True
+    return key, False
+
+
+def book_move(opening_book, position, mask):
+    key, mirrored = canonical_key(position, mask)
+    entry = opening_book.get(key)
+    if entry is None:
+        return None
+    score, column = entry
+    return (WIDTH + 1 - column if mirrored else column), score
+
+
+def top_mask_column(column):
+    return 1 << (HEIGHT - 1 + column * COLUMN_BITS)
+
+
+def bottom_mask_column(column):
+    return 1 << (column * COLUMN_BITS)
+
+
+def play_move(position, mask, column):
+    # position always holds the stones of the player to move
+    return position ^ mask, mask | (mask + bottom_mask_column(column))
+
+
+def possible_moves(mask):
+    return (mask + BOTTOM_MASK) & BOARD_MASK
+
+
+def compute_winning_position(position, mask):
+    # vertical
+    result = (position << 1) & (position << 2) & (position << 3)
+    # horizontal and both diagonals
+    for shift in (COLUMN_BITS, COLUMN_BITS - 1, COLUMN_BITS + 1):
+        pair = (position << shift) & (position << 2 * shift)
+        result |= pair & (position << 3 * shift)
+        result |= pair & (position >> shift)
+        pair = (position >> shift) & (position >> 2 * shift)
+        result |= pair & (position << shift)
+        result |= pair & (position >> 3 * shift)
+    return result & (BOARD_MASK ^ mask)
+
+
+def can_win_next(position, mask):
+    return bool(compute_winning_position(position, mask) & possible_moves(mask))
+
+
+def possible_non_losing_moves(position, mask):
+    possible_mask = possible_moves(mask)
+    opponent_win = compute_winning_position(position ^ mask, mask)
+    forced_moves = possible_mask & opponent_win
+    if forced_moves:
+        if forced_moves & (forced_moves - 1):
+            return 0
+        possible_mask = forced_moves
+    # never play right below a cell that would complete an opponent's line
+    return possible_mask & ~(opponent_win >> 1)
+
+
+class Solver:
+    """
+    Negamax solver for the 7x6 board. Scores are from the side to move: a positive score is a
+    win, larger the earlier it happens, zero is a draw.
+    """
+
+    def __init__(self, transposition_table_size=2 ** 20, opening_book=None):
+        self.transposition_table = TranspositionTable(transposition_table_size)
+        self.opening_book = opening_book
+        self.nodes = 0
+        self._deadline = None
+
+    def negamax(self, position, mask, moves, alpha, beta):
+        self.nodes += 1
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SolverTimeout()
+
+        next_moves = possible_non_losing_moves(position, mask)
+        if next_moves == 0:
+            return -((WIDTH * HEIGHT - moves) // 2)
+        if moves >= WIDTH * HEIGHT - 2:
+            return 0
+
+        minimum = -((WIDTH * HEIGHT - 2 - moves) // 2)
+        if alpha < minimum:
+            alpha = minimum
+            if alpha >= beta:
+                return alpha
+
+        maximum = (WIDTH * HEIGHT - 1 - moves) // 2
+        key = canonical_key(position, mask)[0]
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            maximum = entry[2]
+        if beta > maximum:
+            beta = maximum
+            if alpha >= beta:
+                return beta
+
+        # moves creating the most new winning cells first, center-first between equals
+        candidates = []
+        for order, column in enumerate(CENTER_FIRST_ORDER):
+            move = next_moves & (((1 << HEIGHT) - 1) << (column * COLUMN_BITS))
+            if move:
+                threats = bin(compute_winning_position(position | move, mask)).count('1')
+                candidates.append((-threats, order, move))
+        candidates.sort()
+
+        for _, _, move in candidates:
+            score = -self.negamax(position ^ mask, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.transposition_table.store(key, 0, UPPER_BOUND, alpha, None)
+        return alpha
+
+    def solve(self, position, mask, moves, weak=False, time_budget=None):
+        if can_win_next(position, mask):
+            return (WIDTH * HEIGHT + 1 - moves) // 2
+
+        minimum = -((WIDTH * HEIGHT - moves) // 2)
+        maximum = (WIDTH * HEIGHT + 1 - moves) // 2
+        if weak:
+            minimum, maximum = -1, 1
+
+        self._deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        try:
+            # null-window searches that bisect the score interval, biased towards zero
+            while minimum < maximum:
+                median = minimum + (maximum - minimum) // 2
+                if median <= 0 and minimum // 2 < median:
+                    median = minimum // 2
+                elif median >= 0 and maximum // 2 > median:
+                    median = maximum // 2
+                result = self.negamax(position, mask, moves, median, median + 1)
+                if result <= median:
+                    maximum = result
+                else:
+                    minimum = result
+        finally:
+            self._deadline = None
+        return minimum
+
+    def best_move(self, position, mask, moves, time_budget=None):
+        if self.opening_book is not None:
+            entry = book_move(self.opening_book, position, mask)
+            if entry is not None:
+                return entry
+
+        winning_moves = compute_winning_position(position, mask) & possible_moves(mask)
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        best_column, best_score = None, -WIDTH * HEIGHT
+        for column in CENTER_FIRST_ORDER:
+            if mask & top_mask_column(column):
+                continue
+            move = (mask + bottom_mask_column(column)) & (((1 << HEIGHT) - 1) << (column * COLUMN_BITS))
+            if winning_moves:
+                if winning_moves & move:
+                    return column + 1, (WIDTH * HEIGHT + 1 - moves) // 2
+                continue
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            score = -self.solve(position ^ mask, mask | move, moves + 1, time_budget=remaining)
+            if score > best_score:
+                best_column, best_score = column + 1, score
+        return best_column, best_score
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+from src.domain.bitboard import BitBoard
+
+
+class TestThreatAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.position = BitBoard()
+        self.threats = ThreatAnalysis(self.position)
+
+    def test_winning_moves(self):
+        user, computer = '1', '2'
+        for column in (1, 2, 3):
+            self.threats.play(column, user)
+        self.assertEqual(self.threats.winning_moves(user), [4])
+        self.assertEqual(self.threats.winning_moves(computer), [])
+        self.threats.play(4, computer)
+        self.assertEqual(self.threats.winning_moves(user), [])
+        self.threats.undo()
+        self.assertEqual(self.threats.winning_moves(user), [4])
+
+    def test_odd_and_even_threats(self):
+        user, computer = '1', '2'
+        # three computer pieces on the second row from the bottom, with nothing under the fourth cell
+        for column in (1, 2, 3):
+            self.threats.play(column, user)
+            self.threats.play(column, computer)
+        self.assertEqual(self.threats.winning_cells(computer), [(5, 4)])
+        self.assertEqual(self.threats.even_threats(computer), [(5, 4)])
+        self.assertEqual(self.threats.odd_threats(computer), [])
+        self.assertEqual(self.threats.odd_threats(user), [(6, 4)])
+        self.assertEqual(self.threats.winning_moves(computer), [])
+        self.assertFalse(self.threats.is_playable(5, 4))
+        self.assertTrue(self.threats.is_playable(6, 4))
+
+    def test_kept_up_to_date(self):
+        user, computer = '1', '2'
+        generator = random.Random(5)
+        for rows, columns, connect in ((6, 7, 4), (7, 9, 5)):
+            position = BitBoard(rows, columns, connect)
+            threats = ThreatAnalysis(position)
+            for game in range(10):
+                plies = 0
+                while not position.last_move_result()[0]:
+                    threats.play(generator.choice(position.get_valid_moves()), user if plies % 2 == 0 else computer)
+                    plies += 1
+                    # asking only sometimes leaves some masks to be worked out from older ones
+                    if generator.random() < 0.5:
+                        copy = BitBoard(rows, columns, connect)
+                        copy.copy_from(position)
+                        fresh = ThreatAnalysis(copy)
+                        for player in (user, computer):
+                            self.assertEqual(threats.winning_cells(player), fresh.winning_cells(player))
+                            self.assertEqual(threats.winning_moves(player), fresh.winning_moves(player))
+                for _ in range(plies):
+                    threats.undo()
+                self.assertEqual(position.get_mask(), 0)
+                self.assertEqual(threats.winning_cells(user), [])
+
+
+class ThreatAnalysis:
+    """
+    The cells where each player would complete a line on a BitBoard, found for the whole board
+    at once and kept up to date while moves are played and taken back through it: after a move
+    the other player only loses the filled cell, and the mover's cells are looked for again the
+    first time they are asked for. Threats are told apart by whether they can be played now and
+    by the parity of their row counted from the bottom.
+    """
+
+    def __init__(self, position):
+        user, computer = '1', '2'
+        self.position = position
+        self._threats = {user: None, computer: None}
+        self._history = []
+
+    def refresh(self):
+        # forgets everything, for when the position was changed without going through play and undo
+        user, computer = '1', '2'
+        self._threats = {user: None, computer: None}
+        self._history = []
+
+    def play(self, column, player):
+        user, computer = '1', '2'
+        opponent = computer if player == user else user
+        row = self.position.play(column, player)
+        self._history.append(self._threats)
+        opponent_threats = self._threats[opponent]
+        if opponent_threats is not None:
+            opponent_threats &= ~self.position.cell_mask(row, column)
+        self._threats = {player: None, opponent: opponent_threats}
+        return row
+
+    def undo(self):
+        self._threats = self._history.pop()
+        return self.position.undo()
+
+    def threat_mask(self, player):
+        threats = self._threats[player]
+        if threats is None:
+            threats = self._threats[player] = self.position.threat_mask(player)
+        return threats
+
+    def winning_moves(self, player):
+        # the columns where the player wins at once, from left to right
+        return self.position.columns_of(self.threat_mask(player) & self.position.playable_mask())
+
+    def winning_cells(self, player):
+        return self.position.cells_of(self.threat_mask(player))
+
+    def odd_threats(self, player):
+        return self.position.cells_of(self.threat_mask(player) & self.position.odd_rows_mask())
+
+    def even_threats(self, player):
+        return self.position.cells_of(self.threat_mask(player) & ~self.position.odd_rows_mask())
+
+    def is_playable(self, row, column):
+        return bool(self.position.playable_mask() & self.position.cell_mask(row, column))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(8)
+
+    def test_store_and_probe(self):
+        key, depth, value, best_move = 12345, 3, 42, 4
+        self.table.store(key, depth, EXACT, value, best_move)
+        self.assertEqual(self.table.probe(key), (depth, EXACT, value, best_move))
+        self.assertEqual(self.table.hits, 1)
+
+    def test_miss(self):
+        self.assertIsNone(self.table.probe(7))
+        self.assertEqual(self.table.misses, 1)
+        self.assertEqual(self.table.collisions, 0)
+
+    def test_collision(self):
+        key, other_key, depth = 3, 3 + 8, 2
+        self.table.store(key, depth, LOWER_BOUND, 10, 1)
+        self.assertIsNone(self.table.probe(other_key))
+        self.assertEqual(self.table.collisions, 1)
+
+    def test_replace_by_depth(self):
+        key, other_key = 5, 5 + 8
+        self.table.store(key, 4, EXACT, 10, 1)
+        self.table.store(other_key, 2, EXACT, 20, 2)
+        self.assertIsNotNone(self.table.probe(key))
+        self.table.store(other_key, 4, EXACT, 20, 2)
+        self.assertIsNone(self.table.probe(key))
+
+    def test_replace_by_age(self):
+        key, other_key = 5, 5 + 8
+        self.table.store(key, 4, EXACT, 10, 1)
+        self.table.new_search()
+        self.table.store(other_key, 1, UPPER_BOUND, 20, 2)
+        self.assertEqual(self.table.probe(other_key), (1, UPPER_BOUND, 20, 2))
+
+    def test_clear(self):
+        self.table.store(1, 1, EXACT, 1, 1)
+        self.table.probe(1)
+        self.table.clear()
+        self.assertIsNone(self.table.probe(1))
+        self.assertEqual(self.table.get_statistics()['used'], 0)
+
+    def test_get_statistics(self):
+        self.table.store(1, 1, EXACT, 1, 1)
+        self.table.probe(1)
+        self.table.probe(2)
+        statistics = self.table.get_statistics()
+        self.assertEqual(statistics['size'], 8)
+        self.assertEqual(statistics['used'], 1)
+        self.assertEqual(statistics['hits'], 1)
+        self.assertEqual(statistics['misses'], 1)
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results indexed by position hash. A slot is overwritten when
+    it is empty, holds the same position, was written by an older search or holds a
+    shallower result than the new one.
+    """
+
+    def __init__(self, size=2 ** 16):
+        if size < 1:
+            raise ValueError("Transposition table size must be positive")
+        self._size = size
+        self._entries = [None] * size
+        self._age = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        self._age += 1
+
+    def probe(self, key):
+        entry = self._entries[key % self._size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        self.misses += 1
+        if entry is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, flag, value, best_move):
+        index = key % self._size
+        entry = self._entries[index]
+        if entry is None or entry[0] == key or entry[5] != self._age or depth >= entry[1]:
+            self._entries[index] = (key, depth, flag, value, best_move, self._age)
+
+    def clear(self):
+        self._entries = [None] * self._size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def get_statistics(self):
+        return {
+            'size': self._size,
+            'used': sum(entry is not None for entry in self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+        }
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import random
+import unittest
+from src.domain.bitboard import BitBoard
+from src.domain.geometry import STANDARD_GEOMETRY, get_geometry
+
+
+class TestWindowEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.position = BitBoard()
+        self.evaluator = WindowEvaluator('2')
+
+    def test_windows(self):
+        windows, cells = 69, 42
+        self.assertEqual(len(self.evaluator.windows), windows)
+        self.assertEqual(len(self.evaluator.windows_through_cell), cells)
+        self.assertEqual(len(self.evaluator.windows_through_cell[self.evaluator.cell_index(3, 4)]), 13)
+
+    def test_empty_board(self):
+        self.assertEqual(self.evaluator.get_score(), 0)
+
+    def test_play_and_undo(self):
+        computer, user = '2', '1'
+        self.evaluator.play(6, 4, computer)
+        self.evaluator.play(6, 3, user)
+        self.evaluator.undo(6, 3, user)
+        self.evaluator.undo(6, 4, computer)
+        self.assertEqual(self.evaluator.get_score(), 0)
+
+    def test_matches_score_position(self):
+        # the running total must follow the weights of ComputerStrategy.evaluate_window exactly
+        from src.repository.board_repository import ComputerStrategy, BoardActions
+        strategy = ComputerStrategy(BoardActions(BitBoard(), None))
+        generator = random.Random(7)
+        for _ in range(30):
+            self.position.reset_board()
+            played = []
+            for move in range(generator.randint(1, 30)):
+                column = generator.choice(self.position.get_valid_moves())
+                player = '1' if move % 2 == 0 else '2'
+                row = self.position.play(column, player)
+                self.evaluator.play(row, column, player)
+                played.append((row, column, player))
+                self.assertEqual(self.evaluator.get_score(),
+                                 strategy.score_position(self.position.get_grid(), '2'))
+            for player in ('1', '2'):
+                evaluator = WindowEvaluator(player)
+                evaluator.load(self.position.get_grid())
+                self.assertEqual(evaluator.get_score(), strategy.score_position(self.position.get_grid(), player))
+            for row, column, player in reversed(played):
+                self.position.undo()
+                self.evaluator.undo(row, column, player)
+            self.assertEqual(self.evaluator.get_score(), 0)
+
+    def test_other_geometry(self):
+        from src.repository.board_repository import ComputerStrategy, BoardActions
+        position = BitBoard(7, 9, 5)
+        strategy = ComputerStrategy(BoardActions(BitBoard(7, 9, 5), None))
+        evaluator = WindowEvaluator('2', get_geometry(7, 9, 5))
+        self.assertEqual(len(evaluator.windows), len(position.geometry.lines))
+        generator = random.Random(4)
+        for move in range(40):
+            column = generator.choice(position.get_valid_moves())
+            player = '1' if move % 2 == 0 else '2'
+            evaluator.play(position.play(column, player), column, player)
+            self.assertEqual(evaluator.get_score(), strategy.score_position(position.get_grid(), '2'))
+
+
+class WindowEvaluator:
+    """
+    Keeps the ComputerStrategy.score_position score of a board up to date while pieces are
+    dropped and removed: every window of four cells remembers how many pieces of each player
+    it holds, so a move only rescores the windows going through its cell.
+    """
+
+    def __init__(self, player, geometry=STANDARD_GEOMETRY):
+        self._geometry = geometry
+        self._player = player
+        self._opponent = '1' if player == '2' else '2'
+        self._center_columns = geometry.center_columns
+        # the windows are the win lines of the geometry, as cell indexes
+        self.windows = [[self.cell_index(row, column) for row, column in line] for line in geometry.lines]
+        self.windows_through_cell = [[] for _ in range(geometry.rows * geometry.columns)]
+        for window_index, window in enumerate(self.windows):
+            for cell in window:
+                self.windows_through_cell[cell].append(window_index)
+        piece_alignment = geometry.connect
+        self._window_scores = [[self._score_counts(own, other, piece_alignment)
+                                for other in range(piece_alignment + 1)] for own in range(piece_alignment + 1)]
+        self._counts = {player: [0] * len(self.windows), self._opponent: [0] * len(self.windows)}
+        self._score = 0
+
+    def cell_index(self, row, column):
+        return (row - 1) * self._geometry.columns + column - 1
+
+    @staticmethod
+    def _score_counts(own, other, piece_alignment):
+        # same weights as ComputerStrategy.evaluate_window
+        empty = piece_alignment - own - other
+        score = 0
+        if own == piece_alignment:
+            score += 100
+        elif own == piece_alignment - 1 and empty == 1:
+            score += 5
+        elif own == piece_alignment - 2 and empty == 2:
+            score += 2
+        if other == piece_alignment - 1 and empty == 1:
+            score -= 4
+        return score
+
+    def load(self, board):
+        rows, columns, empty = self._geometry.rows, self._geometry.columns, '0'
+        self._counts = {self._player: [0] * len(self.windows), self._opponent: [0] * len(self.windows)}
+        self._score = 0
+        for row in range(1, rows + 1):
+            for column in range(1, columns + 1):
+                if board[row][column] != empty:
+                    self.play(row, column, board[row][column])
+
+    def play(self, row, column, piece):
+        self._update(row, column, piece, 1)
+
+    def undo(self, row, column, piece):
+        self._update(row, column, piece, -1)
+
+    def _update(self, row, column, piece, change):
+        center_weight = 3
+        own_counts, other_counts = self._counts[self._player], self._counts[self._opponent]
+        window_scores = self._window_scores
+        score = self._score
+        for window in self.windows_through_cell[self.cell_index(row, column)]:
+            score -= window_scores[own_counts[window]][other_counts[window]]
+            self._counts[piece][window] += change
+            score += window_scores[own_counts[window]][other_counts[window]]
+        if piece == self._player and column in self._center_columns:
+            score += change * center_weight
+        self._score = score
+
+    def get_score(self):
+        return self._score
+
+
+if __name__ == '__main__':
+    unittest.main()
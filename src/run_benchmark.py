@@ -0,0 +1,33 @@
+import argparse
+import json
+from src.services.tournament import run_tournament
+
+
+def main():
+    levels = (1, 2, 3, 4, 5, 6)
+    parser = argparse.ArgumentParser(description="Play seeded self-play games between two difficulty levels "
+                                                 "and report strength and speed as JSON.")
+    parser.add_argument('first_level', type=int, choices=levels,
+                        help="1 easy, 2 medium, 3 hard, 4 godlike, 5 perfect, 6 monte carlo")
+    parser.add_argument('second_level', type=int, choices=levels)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None, help="replay the same games (picked at random if omitted)")
+    parser.add_argument('--time-budget', type=float, default=None, help="seconds per move for levels 4 to 6")
+    parser.add_argument('--workers', type=int, default=None, help="processes playing games (all CPUs by default)")
+    parser.add_argument('--no-book', action='store_true', help="don't answer early positions from the opening book")
+    parser.add_argument('--record', help="append every game to this game record archive")
+    parser.add_argument('--output', help="write the report to this file instead of the standard output")
+    arguments = parser.parse_args()
+    options = {'opening_book_path': None} if arguments.no_book else {}
+    report = run_tournament(arguments.first_level, arguments.second_level, arguments.games, arguments.seed,
+                            arguments.time_budget, arguments.workers, record_path=arguments.record, **options)
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
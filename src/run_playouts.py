@@ -0,0 +1,33 @@
+import argparse
+import json
+from src.domain.bitboard import BitBoard
+from src.services.playouts import run_playouts
+
+
+def main():
+    user, computer = '1', '2'
+    parser = argparse.ArgumentParser(description="Play random games from positions across all CPUs and report the "
+                                                 "wins, draws and losses of the player to move as JSON.")
+    parser.add_argument('positions', nargs='*', default=[''],
+                        help="columns played from the empty board, e.g. 4453 (the empty board if omitted)")
+    parser.add_argument('--games', type=int, default=100000, help="random games per position")
+    parser.add_argument('--seed', type=int, default=None, help="replay the same games (picked at random if omitted)")
+    parser.add_argument('--workers', type=int, default=None, help="processes playing games (all CPUs by default)")
+    parser.add_argument('--output', help="write the report to this file instead of the standard output")
+    arguments = parser.parse_args()
+    positions = []
+    for moves in arguments.positions:
+        position = BitBoard()
+        for ply, column in enumerate(moves):
+            position.play(int(column), user if ply % 2 == 0 else computer)
+        positions.append(position)
+    text = json.dumps(run_playouts(positions, arguments.games, arguments.seed, arguments.workers), indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
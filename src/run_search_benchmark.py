@@ -0,0 +1,21 @@
+import argparse
+import json
+from src.services.search_benchmark import benchmark_move_ordering
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a fixed set of positions with and without the move "
+                                                 "ordering of the Godlike search and report nodes and time as JSON.")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--output', help="write the report to this file instead of the standard output")
+    arguments = parser.parse_args()
+    text = json.dumps(benchmark_move_ordering(arguments.depth), indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+from src.ui.game_server import GameServer
+
+
+async def serve(arguments):
+    server = GameServer(max_sessions=arguments.max_sessions, workers=arguments.workers,
+                        max_time_budget=arguments.max_time_budget)
+    if arguments.unix:
+        listener = await server.start_unix(arguments.unix)
+    else:
+        listener = await server.start_tcp(arguments.host, arguments.port)
+    print(f"Serving Connect Four on {arguments.unix or f'{arguments.host}:{arguments.port}'}")
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Connect Four server speaking newline-delimited JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7444)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--workers', type=int, default=None, help="processes searching computer moves")
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--max-time-budget', type=float, default=5.0,
+                        help="longest time in seconds a client may ask the computer to think about a move")
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(serve(arguments))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
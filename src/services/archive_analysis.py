@@ -0,0 +1,203 @@
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy
+from src.repository.game_record import GameRecord, GameRecordWriter, GameReplay, read_game_records, \
+    FIRST_PLAYER_WON
+
+_worker_engine = None
+
+
+class TestArchiveAnalysis(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.archive = os.path.join(directory, 'games.c4gr')
+        self.output = os.path.join(directory, 'analysis.jsonl')
+        # the second player stacks on column 7 instead of blocking the row at ply 5
+        self.blunder_game = GameRecord([1, 7, 2, 7, 3, 7, 4], (0, 1), seed=1, result=FIRST_PLAYER_WON)
+        with GameRecordWriter(self.archive) as writer:
+            writer.write(self.blunder_game)
+            for seed in range(2, 6):
+                writer.write(GameRecord([column % 7 + 1 for column in range(seed, seed + 9)], (1, 2), seed=seed))
+
+    def read_output(self):
+        with open(self.output) as output:
+            return [json.loads(line) for line in output]
+
+    def test_analyze_game(self):
+        depth, threshold = 2, 100
+        positions = analyze_game(self.blunder_game, depth, threshold, _create_engine(2 ** 10))
+        self.assertEqual([annotation['ply'] for annotation in positions], list(range(7)))
+        blunders = [annotation['ply'] for annotation in positions if annotation['blunder']]
+        self.assertEqual(blunders, [5])
+        self.assertEqual((positions[5]['played'], positions[5]['best']), (7, 4))
+        self.assertEqual(positions[5]['scores'][3], positions[5]['score'])
+        self.assertEqual(positions[6]['player'], '1')
+
+    def test_analyze_archive(self):
+        summary = analyze_archive(self.archive, self.output, depth=2, workers=1, chunk_size=2)
+        games = self.read_output()
+        self.assertEqual([game['game'] for game in games], list(range(5)))
+        self.assertEqual(summary['games'], 5)
+        self.assertEqual(summary['positions'], 7 + 4 * 9)
+        self.assertEqual(summary['blunders'], sum(annotation['blunder'] for game in games
+                                                  for annotation in game['positions']))
+        os.remove(self.output + '.checkpoint')
+        analyze_archive(self.archive, self.output, depth=2, workers=2, chunk_size=1)
+        self.assertEqual(self.read_output(), games)
+
+    def test_resume(self):
+        analyze_archive(self.archive, self.output, depth=2, workers=1, chunk_size=2)
+        games = self.read_output()
+        os.remove(self.output + '.checkpoint')
+
+        def interrupt(done):
+            if done >= 2:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            analyze_archive(self.archive, self.output, depth=2, workers=1, chunk_size=2, progress=interrupt)
+        with open(self.output, 'a') as output:
+            output.write('{"partial')
+        summary = analyze_archive(self.archive, self.output, depth=2, workers=1, chunk_size=2)
+        self.assertEqual(self.read_output(), games)
+        self.assertEqual(summary['games'], 5)
+        with self.assertRaises(ValueError):
+            analyze_archive(self.archive, self.output, depth=3, workers=1)
+
+
+def _create_engine(transposition_table_size):
+    position = BitBoard()
+    board_action = BoardActions(position, None)
+    return position, ComputerStrategy(board_action, transposition_table_size)
+
+
+def _initialize_worker(transposition_table_size):
+    global _worker_engine
+    _worker_engine = _create_engine(transposition_table_size)
+
+
+def analyze_game(record, depth, blunder_threshold, engine):
+    columns = 7
+    position, computer_strategy = engine
+    # the strategy always moves the '2' pieces: the first player's moves are looked at on the swapped replay
+    replays = (GameReplay(record, swapped=True), GameReplay(record))
+    annotations = []
+    for ply, played in enumerate(record.columns):
+        position.copy_from(replays[ply % 2].position(ply))
+        scores = computer_strategy.score_moves(depth)
+        if played not in scores:
+            raise ValueError(f"Illegal move {played} at ply {ply}")
+        best = max(scores, key=lambda column: (scores[column], -column))
+        loss = scores[best] - scores[played]
+        annotations.append({
+            'ply': ply,
+            'player': '1' if ply % 2 == 0 else '2',
+            'played': played,
+            'best': best,
+            'score': scores[best],
+            'played_score': scores[played],
+            'scores': [scores.get(column) for column in range(1, columns + 1)],
+            'blunder': loss > blunder_threshold,
+        })
+    return annotations
+
+
+def _analyze_chunk(games, depth, blunder_threshold):
+    # every game becomes its JSON line with its number of positions and blunders
+    lines = []
+    for index, record in games:
+        annotations = analyze_game(record, depth, blunder_threshold, _worker_engine)
+        line = json.dumps({
+            'game': index,
+            'seed': record.seed,
+            'difficulties': record.difficulties,
+            'result': record.result,
+            'positions': annotations,
+        })
+        lines.append((line, len(annotations), sum(annotation['blunder'] for annotation in annotations)))
+    return lines
+
+
+def _chunks(items, chunk_size):
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _load_checkpoint(path, settings):
+    if not os.path.exists(path):
+        return {'settings': settings, 'games': 0, 'positions': 0, 'blunders': 0, 'output_size': 0}
+    with open(path) as file:
+        checkpoint = json.load(file)
+    if checkpoint['settings'] != settings:
+        raise ValueError("The checkpoint was written by an analysis with other settings")
+    return checkpoint
+
+
+def _save_checkpoint(path, checkpoint):
+    # written next to the real file and renamed over it, so a crash never leaves half a checkpoint
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(checkpoint, file)
+    os.replace(temporary_path, path)
+
+
+def analyze_archive(archive_path, output_path, depth=4, blunder_threshold=100, workers=None, chunk_size=64,
+                    checkpoint_path=None, transposition_table_size=2 ** 16, progress=None):
+    """
+    Annotates every position of a game archive with the Godlike search score of each move and
+    writes one JSON line per game, in archive order, to output_path. Chunks of games are
+    analysed in a process pool; after every chunk the checkpoint file records how far the
+    output goes, so an interrupted run picks up from there when started again.
+    """
+    checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+    settings = {'archive': os.path.abspath(archive_path), 'depth': depth, 'blunder_threshold': blunder_threshold}
+    checkpoint = _load_checkpoint(checkpoint_path, settings)
+    if os.path.exists(output_path):
+        # drop whatever was written after the last checkpoint
+        os.truncate(output_path, checkpoint['output_size'])
+    records = itertools.islice(read_game_records(archive_path), checkpoint['games'], None)
+    chunks = _chunks(enumerate(records, start=checkpoint['games']), chunk_size)
+
+    with open(output_path, 'a') as output:
+        def write(lines):
+            for line, positions, blunders in lines:
+                checkpoint['positions'] += positions
+                checkpoint['blunders'] += blunders
+                output.write(line + '\n')
+            output.flush()
+            checkpoint['games'] += len(lines)
+            checkpoint['output_size'] = output.tell()
+            _save_checkpoint(checkpoint_path, checkpoint)
+            if progress is not None:
+                progress(checkpoint['games'])
+
+        if workers == 1:
+            _initialize_worker(transposition_table_size)
+            for chunk in chunks:
+                write(_analyze_chunk(chunk, depth, blunder_threshold))
+        else:
+            workers = workers or os.cpu_count()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                                     initargs=(transposition_table_size,)) as executor:
+                # a bounded number of chunks in flight keeps memory flat and the output in archive order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_analyze_chunk, chunk, depth, blunder_threshold))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    return {key: checkpoint[key] for key in ('games', 'positions', 'blunders')}
+
+
+if __name__ == '__main__':
+    unittest.main()
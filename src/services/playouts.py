@@ -0,0 +1,152 @@
+import os
+import random
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from src.domain.bitboard import BitBoard
+from src.repository.mcts import MonteCarloTreeSearch, playout_tables, random_playout
+from src.services.tournament import wilson_interval
+
+
+class TestPlayouts(unittest.TestCase):
+    def test_reproducible_whatever_the_workers(self):
+        user, seed = '1', 3
+        position = BitBoard()
+        position.play(4, user)
+        report = run_playouts([BitBoard(), position], 500, seed, workers=1, chunk_size=64)
+        again = run_playouts([BitBoard(), position], 500, seed, workers=2, chunk_size=64)
+        self.assertEqual(report['positions'], again['positions'])
+        empty, first = report['positions']
+        self.assertEqual((empty['moves'], empty['player'], first['moves'], first['player']), ('', '1', '4', '2'))
+        self.assertEqual(empty['wins'] + empty['draws'] + empty['losses'], 500)
+        self.assertLessEqual(empty['win_rate']['low'], empty['win_rate']['estimate'])
+        self.assertEqual(report['games'], 1000)
+
+    def test_forced_results(self):
+        user, computer = '1', '2'
+        position = BitBoard()
+        for column in (1, 2, 1, 2, 1, 2):
+            position.play(column, user if column == 1 else computer)
+        statistics = run_playouts([position], 200, 1, workers=1)['positions'][0]
+        # both players have three in a column, and the user, who moves first, wins more often
+        self.assertEqual(statistics['wins'] + statistics['losses'], 200)
+        self.assertGreater(statistics['wins'], statistics['losses'])
+
+    def test_finished_position(self):
+        user = '1'
+        position = BitBoard()
+        for column in (1, 2, 3, 4):
+            position.play(column, user)
+        with self.assertRaises(ValueError):
+            run_playouts([position], 10, workers=1)
+
+    def test_root_parallel_move(self):
+        user, computer = '1', '2'
+        position = BitBoard()
+        for column in (4, 4, 4):
+            position.play(column, user)
+        self.assertEqual(root_parallel_move(position, computer, iterations=1500, seed=1, workers=1), 4)
+
+
+def _player_to_move(position):
+    # the first player ('1') moves whenever both have as many pieces
+    user, computer = '1', '2'
+    return user if position.get_pieces(user).bit_count() == position.get_pieces(computer).bit_count() else computer
+
+
+def _playout_chunk(task):
+    rows, columns, connect, pieces, mask, games, seed = task
+    tables = playout_tables(rows, columns, connect)
+    generator = random.Random(seed)
+    outcomes = [0, 0, 0]
+    for _ in range(games):
+        # 1 win, 0 draw and -1 loss of the player to move index draws, wins and losses
+        outcomes[random_playout(tables, pieces, mask, generator)] += 1
+    return outcomes
+
+
+def _position_report(position, outcomes):
+    draws, wins, losses = outcomes
+    games = wins + draws + losses
+    report = {'moves': ''.join(str(column) for column in position.get_moves()), 'player': _player_to_move(position),
+              'games': games, 'wins': wins, 'draws': draws, 'losses': losses}
+    for name, count in (('win_rate', wins), ('draw_rate', draws), ('loss_rate', losses)):
+        low, high = wilson_interval(count, games)
+        report[name] = {'estimate': count / games if games else 0.0, 'low': low, 'high': high}
+    return report
+
+
+def run_playouts(positions, games_per_position, seed=None, workers=None, chunk_size=10000):
+    """
+    Plays `games_per_position` random games from every BitBoard in a pool of worker processes and
+    returns the JSON-ready wins, draws and losses of the player to move in each. The games are split
+    into chunks of `chunk_size`, and every chunk draws from its own generator, seeded from `seed`
+    in order, so the same seed gives the same counts with any number of workers.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    seeds = random.Random(seed)
+    tasks, owners = [], []
+    for index, position in enumerate(positions):
+        if position.last_move_result()[0]:
+            raise ValueError("The game is already over in position " + str(index + 1))
+        geometry = position.geometry
+        pieces, mask = position.get_pieces(_player_to_move(position)), position.get_mask()
+        for start in range(0, games_per_position, chunk_size):
+            games = min(chunk_size, games_per_position - start)
+            tasks.append((geometry.rows, geometry.columns, geometry.connect, pieces, mask, games,
+                          seeds.getrandbits(64)))
+            owners.append(index)
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_playout_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_playout_chunk, tasks))
+    elapsed = time.perf_counter() - start
+    outcomes = [[0, 0, 0] for _ in positions]
+    for index, result in zip(owners, results):
+        for outcome in range(3):
+            outcomes[index][outcome] += result[outcome]
+    games = games_per_position * len(positions)
+    return {
+        'games': games,
+        'seed': seed,
+        'elapsed_seconds': elapsed,
+        'games_per_second': games / elapsed if elapsed > 0 else 0.0,
+        'positions': [_position_report(position, outcome) for position, outcome in zip(positions, outcomes)],
+    }
+
+
+def _search_tree(task):
+    position, player, time_budget, iterations, seed = task
+    engine = MonteCarloTreeSearch(position.geometry, seed=seed)
+    engine.best_move(position, player, time_budget, iterations)
+    return engine.root_visits()
+
+
+def root_parallel_move(position, player, time_budget=None, iterations=None, seed=None, workers=None):
+    """
+    Root-parallel Monte Carlo tree search: every worker process grows its own tree from the
+    position with its own seed, for the same time or number of iterations, and the move visited
+    most over all the trees is played.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    seeds = random.Random(seed)
+    workers = workers or os.cpu_count()
+    tasks = [(position, player, time_budget, iterations, seeds.getrandbits(64)) for _ in range(workers)]
+    if workers == 1:
+        trees = [_search_tree(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            trees = list(executor.map(_search_tree, tasks))
+    visits = {}
+    for tree in trees:
+        for column, count in tree.items():
+            visits[column] = visits.get(column, 0) + count
+    return max(visits, key=lambda column: (visits[column], -column))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import time
+import unittest
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy
+
+# positions from seeded random games, as the columns played from the empty board, the first player
+# on the '1' pieces; none is over and in none can a player win on the next move
+BENCHMARK_POSITIONS = ('734337', '34435274', '21627173', '34576234', '1721', '462321', '73264534', '74257233',
+                       '56', '5762212517557561', '62424336', '23427234')
+
+
+class TestSearchBenchmark(unittest.TestCase):
+    def test_benchmark_move_ordering(self):
+        depth = 4
+        report = benchmark_move_ordering(depth, BENCHMARK_POSITIONS[:4])
+        self.assertEqual((report['depth'], report['positions']), (depth, 4))
+        self.assertTrue(report['same_moves'])
+        self.assertEqual(len(report['moves']), 4)
+        self.assertLess(report['ordered']['nodes'], report['unordered']['nodes'])
+        self.assertGreater(report['node_reduction'], 1)
+
+
+def _load_position(position, moves):
+    user, computer = '1', '2'
+    position.reset_board()
+    for ply, column in enumerate(moves):
+        position.play(int(column), user if ply % 2 == 0 else computer)
+
+
+def _search_positions(depth, positions, move_ordering, transposition_table_size):
+    # a new strategy every time, so no search reuses the transposition table of the other
+    position = BitBoard()
+    computer_strategy = ComputerStrategy(BoardActions(position, None), transposition_table_size,
+                                         opening_book_path=None)
+    computer_strategy.move_ordering = move_ordering
+    moves = []
+    start = time.perf_counter()
+    for position_moves in positions:
+        _load_position(position, position_moves)
+        scores = computer_strategy.score_moves(depth)
+        # equal scores go to the leftmost column, as in the Godlike search
+        moves.append(max(scores, key=lambda column: (scores[column], -column)))
+    return moves, {'nodes': computer_strategy.nodes, 'seconds': time.perf_counter() - start}
+
+
+def benchmark_move_ordering(depth=6, positions=BENCHMARK_POSITIONS, transposition_table_size=2 ** 16):
+    """
+    Searches every position at the same depth with the Godlike search in plain column order and
+    with its move ordering, and reports the nodes and time of both and whether they chose the
+    same moves.
+    """
+    unordered_moves, unordered = _search_positions(depth, positions, False, transposition_table_size)
+    ordered_moves, ordered = _search_positions(depth, positions, True, transposition_table_size)
+    return {
+        'depth': depth,
+        'positions': len(positions),
+        'unordered': unordered,
+        'ordered': ordered,
+        'node_reduction': unordered['nodes'] / ordered['nodes'] if ordered['nodes'] else 0.0,
+        'same_moves': ordered_moves == unordered_moves,
+        'moves': ordered_moves,
+    }
+
+
+if __name__ == '__main__':
+    unittest.main()
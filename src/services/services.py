@@ -1,5 +1,12 @@
+import random
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy
+
+_engine = threading.local()
 
 
 class TestServices(unittest.TestCase):
@@ -20,7 +27,12 @@ class TestServices(unittest.TestCase):
     def test_computer_move(self):
         move = 3
         self.services.computer_move(move)
-        self.board_repository.computer_move.assert_called_once_with(move)
+        self.board_repository.computer_move.assert_called_once_with(move, None)
+
+    def test_computer_move_with_time_budget(self):
+        move, time_budget = 4, 0.05
+        self.services.computer_move(move, time_budget)
+        self.board_repository.computer_move.assert_called_once_with(move, time_budget)
 
     def test_restart_game(self):
         self.board_repository.restart_game.return_value = True
@@ -42,6 +54,104 @@ class TestServices(unittest.TestCase):
         self.assertEqual(result, [[0] * columns for _ in range(rows)])
 
 
+class TestBatchComputerMoves(unittest.TestCase):
+    def random_requests(self, count, seed):
+        generator, user, computer, difficulties = random.Random(seed), '1', '2', (1, 2, 3, 4)
+        requests = []
+        while len(requests) < count:
+            position = BitBoard()
+            for move in range(generator.randrange(0, 20, 2)):
+                position.play(generator.choice(position.get_valid_moves()), user if move % 2 == 0 else computer)
+            if position.last_move_result()[0]:
+                continue
+            # grids and BitBoards are both accepted
+            requests.append((position if len(requests) % 2 else position.to_grid(),
+                             difficulties[len(requests) % len(difficulties)], None, generator.getrandbits(32)))
+        return requests
+
+    def single_move(self, position, difficulty, time_budget, seed):
+        columns = 7
+        game = BitBoard()
+        board_action = BoardActions(game, None)
+        board_action.computer_strategy = ComputerStrategy(board_action)
+        game.copy_from(position if isinstance(position, BitBoard) else BitBoard.from_grid(position))
+        heights = [game.column_height(column) for column in range(1, columns + 1)]
+        random.seed(seed)
+        Services(board_action).computer_move(difficulty, time_budget)
+        return next(column for column in range(1, columns + 1) if game.column_height(column) != heights[column - 1])
+
+    def test_same_moves_as_single_requests(self):
+        requests = self.random_requests(24, 8)
+        columns = Services(None).computer_moves(requests)
+        self.assertEqual(columns, [self.single_move(*request) for request in requests])
+
+    def test_executor(self):
+        requests = self.random_requests(12, 9)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            columns = Services(None).computer_moves(requests, executor, chunk_size=5)
+        self.assertEqual(columns, Services(None).computer_moves(requests))
+
+    def test_seeds_independent_of_other_threads(self):
+        requests = self.random_requests(12, 10)
+        columns = choose_computer_moves(requests)
+        random.seed(1)
+        state = random.getstate()
+        self.assertEqual(choose_computer_moves(requests), columns)
+        # seeded moves draw from their own generators, not from the one unseeded moves share
+        self.assertEqual(random.getstate(), state)
+        unseeded = [(position, 1, None) for position, _, _, _ in requests] * 20
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            noise = executor.submit(choose_computer_moves, unseeded)
+            seeded = executor.submit(choose_computer_moves, requests)
+            noise.result()
+            self.assertEqual(seeded.result(), columns)
+
+    def test_other_board_size(self):
+        user = '1'
+        position = BitBoard(7, 9, 5)
+        for column in (6, 7, 8, 9):
+            position.play(column, user)
+        self.assertEqual(Services(None).computer_moves([(position, 3, None, 1), (position, 4, None, 1)]), [5, 5])
+
+    def test_empty_batch(self):
+        self.assertEqual(Services(None).computer_moves([]), [])
+
+
+def _warm_engine(geometry):
+    # one board and strategy per board size and thread or process, kept for every later batch
+    if not hasattr(_engine, 'engines'):
+        _engine.engines = {}
+    if geometry not in _engine.engines:
+        position = BitBoard(geometry.rows, geometry.columns, geometry.connect)
+        board_action = BoardActions(position, None)
+        board_action.computer_strategy = ComputerStrategy(board_action)
+        _engine.engines[geometry] = position, board_action.computer_strategy
+    return _engine.engines[geometry]
+
+
+def choose_computer_moves(requests):
+    """
+    Chooses the computer's column for every (position, difficulty, time budget[, seed])
+    request with the warm engine of the calling thread. A position is a BitBoard or a
+    get_board() grid (connect-4), and a seed gives the move its own generator, seeded as a single
+    computer_move after random.seed would see it, so no other thread can draw from it.
+    """
+    columns = []
+    for request in requests:
+        position, difficulty, time_budget = request[:3]
+        if not isinstance(position, BitBoard):
+            position = BitBoard.from_grid(position)
+        engine_position, computer_strategy = _warm_engine(position.geometry)
+        engine_position.copy_from(position)
+        seeded = len(request) > 3 and request[3] is not None
+        computer_strategy.random = random.Random(request[3]) if seeded else random
+        try:
+            columns.append(computer_strategy.set_computer_difficulty(difficulty, time_budget))
+        finally:
+            computer_strategy.random = random
+    return columns
+
+
 class Services:
     def __init__(self, board_repository):
         self.board_repository = board_repository
@@ -52,8 +162,15 @@ class Services:
     def add_move_on_board(self, player, type_finder):
         self.board_repository.add_move_on_board(player, type_finder)
 
-    def computer_move(self, computer_difficulty):
-        self.board_repository.computer_move(computer_difficulty)
+    def computer_move(self, computer_difficulty, time_budget=None):
+        self.board_repository.computer_move(computer_difficulty, time_budget)
+
+    def computer_moves(self, requests, executor=None, chunk_size=16):
+        # batches are split into chunks so every executor worker reuses its warm engine for many moves
+        if executor is None:
+            return choose_computer_moves(requests)
+        chunks = [requests[start:start + chunk_size] for start in range(0, len(requests), chunk_size)]
+        return [column for columns in executor.map(choose_computer_moves, chunks) for column in columns]
 
     def restart_game(self):
         return self.board_repository.restart_game()
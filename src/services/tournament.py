@@ -0,0 +1,202 @@
+import math
+import os
+import random
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, ComputerStrategy
+from src.repository.opening_book import DEFAULT_BOOK_PATH
+from src.repository.game_record import GameRecord, GameRecordWriter, read_game_records, FIRST_PLAYER_WON, \
+    SECOND_PLAYER_WON, DRAW, MAX_SEED
+
+LEVEL_NAMES = {1: 'easy', 2: 'medium', 3: 'hard', 4: 'godlike', 5: 'perfect', 6: 'monte carlo'}
+
+
+class TestTournament(unittest.TestCase):
+    def test_wilson_interval(self):
+        low, high = wilson_interval(0, 10)
+        self.assertEqual(low, 0)
+        self.assertAlmostEqual(high, 0.2775, places=4)
+        low, high = wilson_interval(5, 10)
+        self.assertAlmostEqual(low, 1 - high)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3], 0.95), 3)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_play_game_is_reproducible(self):
+        easy, hard, seed = 1, 3, 11
+        first, second = play_game((easy, hard), seed), play_game((easy, hard), seed)
+        self.assertEqual(first['winner'], second['winner'])
+        self.assertEqual(first['columns'], second['columns'])
+        self.assertEqual(len(first['latencies'][0]) + len(first['latencies'][1]), len(first['columns']))
+
+    def test_play_game_counts_nodes(self):
+        easy, godlike, seed = 1, 4, 2
+        game = play_game((godlike, easy), seed, opening_book_path=None)
+        self.assertGreater(game['nodes'][0], 0)
+        self.assertEqual(game['nodes'][1], 0)
+
+    def test_run_tournament(self):
+        easy, medium, games, seed = 1, 2, 6, 5
+        report = run_tournament(easy, medium, games, seed, workers=2)
+        first, second = report['levels']
+        self.assertEqual(first['name'], 'easy')
+        self.assertEqual(first['wins'] + first['draws'] + first['losses'], games)
+        self.assertEqual((first['wins'], first['losses']), (second['losses'], second['wins']))
+        self.assertLessEqual(first['win_rate']['low'], first['win_rate']['estimate'])
+        self.assertIn('p99', first['latency_ms'])
+        path = os.path.join(tempfile.mkdtemp(), 'games.c4gr')
+        again = run_tournament(easy, medium, games, seed, workers=1, record_path=path)
+        self.assertEqual([(level['wins'], level['draws'], level['moves']) for level in again['levels']],
+                         [(level['wins'], level['draws'], level['moves']) for level in report['levels']])
+        records = list(read_game_records(path))
+        self.assertEqual([record.seed for record in records], list(range(seed, seed + games)))
+        self.assertEqual(records[1].difficulties, (medium, easy))
+        self.assertEqual(sum(len(record.columns) for record in records), first['moves'] + second['moves'])
+        # seeds the archive can't hold are refused before any game is played
+        with self.assertRaises(ValueError):
+            run_tournament(easy, medium, games, MAX_SEED, workers=1, record_path=path)
+
+
+def wilson_interval(successes, trials, z=1.96):
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def percentile(values, fraction):
+    # nearest-rank percentile, so the result is always one of the measured values
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class SelfPlayer:
+    """
+    One side of a self-play game. It keeps its own board where its pieces are the computer's
+    ('2') and the other side's are the user's ('1'), so every strategy plays as usual.
+    """
+
+    def __init__(self, difficulty, opening_book_path):
+        self.difficulty = difficulty
+        self.board_action = BoardActions(BitBoard(), None)
+        self.computer_strategy = ComputerStrategy(self.board_action, opening_book_path=opening_book_path)
+        self.board_action.computer_strategy = self.computer_strategy
+
+    def nodes_searched(self):
+        solver = self.computer_strategy.solver
+        return self.computer_strategy.nodes + (solver.nodes if solver is not None else 0)
+
+
+def play_game(difficulties, seed, first_player=0, time_budget=None, opening_book_path=DEFAULT_BOOK_PATH):
+    user, computer = '1', '2'
+    # the strategies draw from the module-level random generator
+    random.seed(seed)
+    players = [SelfPlayer(difficulty, opening_book_path) for difficulty in difficulties]
+    columns, latencies, nodes = [], [[], []], [0, 0]
+    turn = first_player
+    while True:
+        player, opponent = players[turn], players[1 - turn]
+        nodes_before = player.nodes_searched()
+        start = time.perf_counter()
+        column = player.computer_strategy.set_computer_difficulty(player.difficulty, time_budget)
+        latencies[turn].append(time.perf_counter() - start)
+        nodes[turn] += player.nodes_searched() - nodes_before
+        player.board_action.add_move_on_board(column, computer)
+        opponent.board_action.add_move_on_board(column, user)
+        columns.append(column)
+        game_over, winner = player.board_action.is_game_over()
+        if game_over:
+            return {
+                'seed': seed,
+                'first_player': first_player,
+                'winner': turn if winner == computer else None,
+                'columns': columns,
+                'latencies': latencies,
+                'nodes': nodes,
+            }
+        turn = 1 - turn
+
+
+def _play_game_task(arguments):
+    return play_game(*arguments)
+
+
+def _level_report(difficulty, index, games):
+    wins = sum(1 for game in games if game['winner'] == index)
+    draws = sum(1 for game in games if game['winner'] is None)
+    losses = len(games) - wins - draws
+    latencies = [latency for game in games for latency in game['latencies'][index]]
+    nodes = sum(game['nodes'][index] for game in games)
+    thinking_time = sum(latencies)
+    report = {'difficulty': difficulty, 'name': LEVEL_NAMES.get(difficulty, str(difficulty)),
+              'wins': wins, 'draws': draws, 'losses': losses}
+    for name, count in (('win_rate', wins), ('draw_rate', draws), ('loss_rate', losses)):
+        low, high = wilson_interval(count, len(games))
+        report[name] = {'estimate': count / len(games) if games else 0.0, 'low': low, 'high': high}
+    report['moves'] = len(latencies)
+    report['latency_ms'] = {name: (value * 1000 if value is not None else None)
+                            for name, value in (('p50', percentile(latencies, 0.5)),
+                                                ('p95', percentile(latencies, 0.95)),
+                                                ('p99', percentile(latencies, 0.99)))}
+    report['nodes'] = nodes
+    report['nodes_per_second'] = nodes / thinking_time if thinking_time > 0 else 0.0
+    return report
+
+
+def _game_record(difficulties, game):
+    first_player = game['first_player']
+    result = DRAW
+    if game['winner'] is not None:
+        result = FIRST_PLAYER_WON if game['winner'] == first_player else SECOND_PLAYER_WON
+    return GameRecord(game['columns'], (difficulties[first_player], difficulties[1 - first_player]),
+                      game['seed'], result)
+
+
+def run_tournament(first_difficulty, second_difficulty, games, seed=None, time_budget=None, workers=None,
+                   opening_book_path=DEFAULT_BOOK_PATH, record_path=None):
+    """
+    Plays `games` self-play games between two difficulty levels in a pool of worker processes and
+    returns the JSON-ready report. The levels take turns moving first, and game i is seeded with
+    seed + i, so the same seed replays the same games (unless a time budget makes the search
+    depth depend on the machine). With `record_path`, every game is appended to that archive.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    if record_path is not None and not 0 <= seed <= MAX_SEED - games + 1:
+        raise ValueError("Recorded seeds must be between 0 and 2 ** 64 - 1")
+    difficulties = (first_difficulty, second_difficulty)
+    tasks = [(difficulties, seed + game, game % 2, time_budget, opening_book_path) for game in range(games)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_game_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_play_game_task, tasks, chunksize=max(1, games // 64)))
+    if record_path is not None:
+        with GameRecordWriter(record_path) as writer:
+            for game in results:
+                writer.write(_game_record(difficulties, game))
+    return {
+        'games': games,
+        'seed': seed,
+        'time_budget': time_budget,
+        'elapsed_seconds': time.perf_counter() - start,
+        'levels': [_level_report(difficulty, index, results) for index, difficulty in enumerate(difficulties)],
+    }
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,344 @@
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from src.domain.bitboard import BitBoard
+from src.repository.board_repository import BoardActions, BoardException
+from src.services.services import Services, choose_computer_moves
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = GameServer(executor=ThreadPoolExecutor(max_workers=2))
+        self.tcp_server = await self.server.start_tcp('127.0.0.1', 0)
+        port = self.tcp_server.sockets[0].getsockname()[1]
+        self.client = await GameClient.connect_tcp('127.0.0.1', port)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_new_game(self):
+        response = await self.client.request(command='new_game')
+        self.assertTrue(response['ok'])
+        self.assertEqual(response['board'], ['0000000'] * 6)
+        self.assertFalse(response['game_over'])
+
+    async def test_move_and_state(self):
+        game = (await self.client.request(command='new_game'))['game']
+        response = await self.client.request(command='move', game=game, column=4)
+        self.assertEqual(response['board'][5], '0001000')
+        state = await self.client.request(command='state', game=game)
+        self.assertEqual(state['board'], response['board'])
+
+    async def test_ai_move(self):
+        game = (await self.client.request(command='new_game'))['game']
+        await self.client.request(command='move', game=game, column=4)
+        response = await self.client.request(command='ai_move', game=game, difficulty=4, time_budget=0.05)
+        self.assertTrue(response['ok'])
+        self.assertIn(response['column'], range(1, 8))
+        self.assertEqual(''.join(response['board']).count('2'), 1)
+
+    async def test_ai_move_limits(self):
+        game = (await self.client.request(command='new_game'))['game']
+        await self.client.request(command='move', game=game, column=4)
+        for difficulty in (0, 7):
+            response = await self.client.request(command='ai_move', game=game, difficulty=difficulty)
+            self.assertEqual(response['error'], "Unknown difficulty")
+        response = await self.client.request(command='ai_move', game=game, difficulty=4, time_budget=-1)
+        self.assertEqual(response['error'], "The time budget must be positive")
+        self.server.max_time_budget = 0.05
+        start = time.perf_counter()
+        response = await self.client.request(command='ai_move', game=game, difficulty=4, time_budget=3600)
+        self.assertTrue(response['ok'])
+        self.assertLess(time.perf_counter() - start, 1)
+
+    async def test_win(self):
+        game = (await self.client.request(command='new_game'))['game']
+        session = self.server.sessions[game]
+        for column in (1, 2, 3):
+            await self.client.request(command='move', game=game, column=column)
+            session.board_action.add_move_on_board(column, '2')
+        response = await self.client.request(command='move', game=game, column=4)
+        self.assertTrue(response['game_over'])
+        self.assertEqual(response['winner'], '1')
+        response = await self.client.request(command='move', game=game, column=5)
+        self.assertFalse(response['ok'])
+        # the finished game's session hosts the next game
+        self.assertNotIn(game, self.server.sessions)
+        self.assertIs(self.server.sessions[(await self.client.request(command='new_game'))['game']], session)
+
+    async def test_turn_order(self):
+        game = (await self.client.request(command='new_game'))['game']
+        response = await self.client.request(command='ai_move', game=game, difficulty=1)
+        self.assertEqual(response['error'], "Not your turn")
+        await self.client.request(command='move', game=game, column=4)
+        response = await self.client.request(command='move', game=game, column=4)
+        self.assertEqual(response['error'], "Not your turn")
+        self.assertTrue((await self.client.request(command='ai_move', game=game, difficulty=1))['ok'])
+        response = await self.client.request(command='ai_move', game=game, difficulty=1)
+        self.assertEqual(response['error'], "Not your turn")
+
+    async def test_resign(self):
+        game = (await self.client.request(command='new_game'))['game']
+        response = await self.client.request(command='resign', game=game)
+        self.assertEqual(response['winner'], '2')
+        response = await self.client.request(command='state', game=game)
+        self.assertFalse(response['ok'])
+
+    async def test_resigned_sessions_are_reused(self):
+        game = (await self.client.request(command='new_game'))['game']
+        await self.client.request(command='move', game=game, column=4)
+        session = self.server.sessions[game]
+        await self.client.request(command='resign', game=game)
+        response = await self.client.request(command='new_game')
+        self.assertIs(self.server.sessions[response['game']], session)
+        self.assertEqual(response['board'], ['0000000'] * 6)
+        self.assertFalse(response['game_over'])
+        self.assertFalse((await self.client.request(command='move', game=game, column=4))['ok'])
+
+    async def test_errors(self):
+        self.assertFalse((await self.client.request(command='state', game='missing'))['ok'])
+        self.assertFalse((await self.client.request(command='fly'))['ok'])
+        game = (await self.client.request(command='new_game'))['game']
+        for column in (0, 8, 9):
+            response = await self.client.request(command='move', game=game, column=column)
+            self.assertEqual(response['error'], "You can't move here")
+        self.client._writer.write(b'not json\n')
+        self.assertFalse(json.loads(await self.client._reader.readline())['ok'])
+
+    async def test_concurrent_sessions(self):
+        games = [(await self.client.request(command='new_game'))['game'] for _ in range(20)]
+        responses = await asyncio.gather(*(self.server.handle_request({'command': 'move', 'game': game,
+                                                                        'column': index % 7 + 1})
+                                           for index, game in enumerate(games)))
+        self.assertTrue(all(response['ok'] for response in responses))
+        self.assertEqual(len(self.server.sessions), 20)
+
+    async def test_unix_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), 'connect_four.sock')
+        await self.server.start_unix(path)
+        client = await GameClient.connect_unix(path)
+        response = await client.request(command='new_game')
+        await client.close()
+        self.assertTrue(response['ok'])
+
+
+class GameSession:
+    def __init__(self):
+        # computer moves are searched by the warm engines of the executor workers, see choose_computer_moves
+        self.board_action = BoardActions(BitBoard(), None)
+        self.services = Services(self.board_action)
+        self.lock = asyncio.Lock()
+        self.resigned = False
+
+    def player_to_move(self):
+        # the user ('1') moves first, so whenever both have as many pieces
+        user, computer = '1', '2'
+        position = self.board_action.get_position()
+        return user if position.get_pieces(user).bit_count() == position.get_pieces(computer).bit_count() else computer
+
+    def reset(self):
+        # the board is cleared in place so a finished session can host the next game
+        self.board_action.restart_game()
+        self.resigned = False
+
+    def get_state(self):
+        game_over, winner = self.services.is_game_over()
+        if self.resigned:
+            game_over, winner = True, '2'
+        board = self.services.get_board()
+        return {
+            'board': [''.join(board[row][1:]) for row in range(1, len(board))],
+            'game_over': game_over,
+            'winner': winner,
+        }
+
+
+class GameServer:
+    """
+    Headless server hosting many games at once. Clients send one JSON object per line
+    (commands new_game, move, ai_move, state and resign) and get one JSON object per line back.
+    Computer moves run in an executor so a long search never blocks the other sessions.
+    """
+
+    def __init__(self, max_sessions=10000, executor=None, workers=None, pooled_sessions=256, max_time_budget=5.0):
+        self.max_sessions = max_sessions
+        # the longest a client may have a worker search one move, in seconds
+        self.max_time_budget = max_time_budget
+        self.sessions = {}
+        # sessions of finished and resigned games, reset and handed to new games instead of allocating new ones
+        self.pooled_sessions = pooled_sessions
+        self._free_sessions = []
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self._game_ids = itertools.count(1)
+        self._servers = []
+        self._handlers = {
+            'new_game': self._new_game,
+            'move': self._move,
+            'ai_move': self._ai_move,
+            'state': self._state,
+            'resign': self._resign,
+        }
+
+    async def start_tcp(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        self._servers.append(server)
+        return server
+
+    async def start_unix(self, path):
+        server = await asyncio.start_unix_server(self.handle_client, path)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._executor.shutdown(cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Requests must be JSON objects")
+                except ValueError as error:
+                    response = {'ok': False, 'error': str(error)}
+                else:
+                    response = await self.handle_request(request)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request):
+        handler = self._handlers.get(request.get('command'))
+        try:
+            if handler is None:
+                raise ValueError("Unknown command")
+            response = await handler(request)
+        except (BoardException, ValueError, KeyError, TypeError) as error:
+            response = {'ok': False, 'error': str(error) if not isinstance(error, KeyError) else
+                        f"Missing or unknown {error}"}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    def _get_session(self, request):
+        game = request['game']
+        if game not in self.sessions:
+            raise ValueError("Unknown game")
+        return game, self.sessions[game]
+
+    def _check_session(self, game, session):
+        # a request waiting for the lock may find the game resigned and its session recycled
+        if self.sessions.get(game) is not session:
+            raise ValueError("Unknown game")
+
+    async def _new_game(self, request):
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("Too many games")
+        game = str(next(self._game_ids))
+        session = self._free_sessions.pop() if self._free_sessions else GameSession()
+        self.sessions[game] = session
+        return {'ok': True, 'game': game, **session.get_state()}
+
+    async def _move(self, request):
+        user = '1'
+        game, session = self._get_session(request)
+        column = int(request['column'])
+        if column < 1 or column > session.board_action.geometry.columns:
+            raise BoardException("You can't move here")
+        async with session.lock:
+            self._check_session(game, session)
+            self._check_turn(session, user)
+            session.services.add_move_on_board(column, user)
+            return {'ok': True, 'game': game, **self._finish_if_over(game, session)}
+
+    async def _ai_move(self, request):
+        computer, difficulties = '2', range(1, 7)
+        game, session = self._get_session(request)
+        difficulty, time_budget = int(request['difficulty']), request.get('time_budget')
+        if difficulty not in difficulties:
+            raise ValueError("Unknown difficulty")
+        if time_budget is not None:
+            time_budget = float(time_budget)
+            if not time_budget > 0:
+                raise ValueError("The time budget must be positive")
+            time_budget = min(time_budget, self.max_time_budget)
+        async with session.lock:
+            self._check_session(game, session)
+            self._check_turn(session, computer)
+            grid = [list(row) for row in session.services.get_board()]
+            loop = asyncio.get_running_loop()
+            columns = await loop.run_in_executor(self._executor, choose_computer_moves,
+                                                 [(grid, difficulty, time_budget)])
+            column = columns[0]
+            session.services.add_move_on_board(column, computer)
+            return {'ok': True, 'game': game, 'column': column, **self._finish_if_over(game, session)}
+
+    async def _state(self, request):
+        game, session = self._get_session(request)
+        return {'ok': True, 'game': game, **session.get_state()}
+
+    async def _resign(self, request):
+        game, session = self._get_session(request)
+        async with session.lock:
+            self._check_session(game, session)
+            session.resigned = True
+            return {'ok': True, 'game': game, **self._finish_if_over(game, session)}
+
+    @staticmethod
+    def _check_turn(session, player):
+        if session.get_state()['game_over']:
+            raise ValueError("Game over")
+        if session.player_to_move() != player:
+            raise ValueError("Not your turn")
+
+    def _finish_if_over(self, game, session):
+        # the state of the game; a finished game is closed and its session reset for a later game
+        state = session.get_state()
+        if state['game_over']:
+            del self.sessions[game]
+            if len(self._free_sessions) < self.pooled_sessions:
+                session.reset()
+                self._free_sessions.append(session)
+        return state
+
+
+class GameClient:
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect_tcp(cls, host, port):
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path):
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def request(self, **request):
+        self._writer.write(json.dumps(request).encode() + b'\n')
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+if __name__ == '__main__':
+    unittest.main()
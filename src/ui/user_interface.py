@@ -19,8 +19,9 @@ from src.repository.board_repository import BoardException
 
 
 class UserInterface:
-    def __init__(self, service):
+    def __init__(self, service, time_budget=None):
         self.service = service
+        self.time_budget = time_budget
 
     @staticmethod
     def try_and_except_input(left_bound, right_bound) -> int:
@@ -40,6 +41,8 @@ class UserInterface:
         print("2. Medium")
         print("3. Hard")
         print("4. Godlike")
+        print("5. Perfect")
+        print("6. Monte Carlo")
 
     @staticmethod
     def verify_input(user_move) -> bool:
@@ -51,13 +54,15 @@ class UserInterface:
         game_over = False
         user, computer = '1', '2'
         self.computer_difficulty_level_menu()
-        computer_difficulty = self.try_and_except_input(1, 4)
+        computer_difficulty = self.try_and_except_input(1, 6)
 
         while not game_over:
+            # the header row of the board names the columns
+            column_names = list(self.service.get_board()[0][1:])
             while True:
                 try:
-                    user_move = input("Your move (between A - G) -> ").upper()
-                    if user_move not in ['A', 'B', 'C', 'D', 'E', 'F', 'G']:
+                    user_move = input(f"Your move (between {column_names[0]} - {column_names[-1]}) -> ").upper()
+                    if user_move not in column_names:
                         raise ValueError("Enter right move")
                     user_move = ord(user_move.upper()) - ord('A') + 1
                     break
@@ -73,7 +78,7 @@ class UserInterface:
                     user_move = input("Enter right move -> ")
                     user_move = ord(user_move.upper()) - ord('A') + 1
 
-            self.service.computer_move(computer_difficulty)
+            self.service.computer_move(computer_difficulty, self.time_budget)
             game_over, winner = self.service.is_game_over()
             if not game_over:
                 print(self.service.display_board())